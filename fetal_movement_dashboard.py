@@ -1,20 +1,1241 @@
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import re
+import base64
+import hashlib
+import heapq
+import html
+import itertools
+import json
+import pickle
+import sys
+import time
 import numpy as np
 import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime as dt
+from types import MappingProxyType
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Loop kernels (intervals, episode runs, sliding windows, onset merging) are
+# JIT-compiled with Numba when it is installed; FETAL_MOVEMENT_KERNELS=numpy
+# forces the NumPy/Python fallback, which gives identical results
+KERNEL_BACKEND = 'numba' if numba is not None and os.environ.get('FETAL_MOVEMENT_KERNELS') != 'numpy' else 'numpy'
+
+MINUTES_PER_DAY = 24 * 60
+
+# Fields of every movement record (see FetalMovementAnalyzer._make_movement);
+# charts name them so an empty log still yields the expected columns
+MOVEMENT_FIELDS = ('id', 'original', 'day', 'datetime', 'hour', 'minute', 'time_str', 'hour_decimal')
+
+# Bin widths (minutes) offered by the hourly chart's resolution switcher
+HISTOGRAM_RESOLUTIONS = (1, 5, 15, 30, 60)
+
+# Narrower bins hold too few detections for an hourly-rate activity level
+# (one detection in a 1-minute bin would read as 60/hour), so they get a
+# neutral color and no status
+MIN_ACTIVITY_BIN_MINUTES = 15
+NEUTRAL_BAR_COLOR = '#94a3b8'
+
+
+# Analysis stages computed by _analyze_parsed beyond the parsed movements:
+# intervals (gaps, statuses, compliance), histograms (per-minute counts and
+# time-of-day patterns), cube (day x bin matrix and baseline), episodes and
+# trends (per-day activity and where it shifts)
+ANALYSIS_STAGES = ('intervals', 'histograms', 'cube', 'episodes', 'trends')
+
+# Dashboard sections in assembly order:
+# (name, builder method, builder args, analysis stages the builder reads).
+# Builders are independent of each other, so they can render concurrently.
+DASHBOARD_SECTIONS = (
+    ('timeline', 'create_24hour_timeline_chart', (), ()),
+    ('hourly', 'create_hourly_distribution_chart', (HISTOGRAM_RESOLUTIONS,), ('histograms', 'cube')),
+    ('density', 'create_activity_density_chart', (), ('histograms',)),
+    ('heatmap', 'create_activity_heatmap_chart', (), ('cube',)),
+    ('trends', 'create_activity_trend_chart', (), ('trends',)),
+    ('episodes', 'create_episodes_chart', (), ('episodes',)),
+    ('pattern', 'create_pattern_analysis_chart', (), ('cube',)),
+    ('intervals', 'create_intervals_safety_chart', (), ('intervals',)),
+    ('table', 'create_intervals_table_html', (), ('intervals',)),
+)
+SECTION_REGISTRY = {section[0]: section for section in DASHBOARD_SECTIONS}
+
+# Plotly-free inline SVG builders for the sections the 'svg' backend supports
+SVG_SECTION_BUILDERS = {
+    'timeline': 'create_24hour_timeline_svg',
+    'hourly': 'create_hourly_distribution_svg',
+    'intervals': 'create_intervals_safety_svg',
+    'table': 'create_intervals_table_html',
+}
+
+# Scalar stats shown on the dashboard's stat cards (all from the intervals stage)
+STAT_CARD_KEYS = (
+    'total_detections', 'avg_interval', 'max_interval', 'min_interval',
+    'normal_intervals', 'monitor_intervals', 'concern_intervals', 'compliance',
+    'rejected_tokens'
+)
+
+# Values a live-updating page refreshes from sidecar stats snapshots
+SIDECAR_STAT_KEYS = STAT_CARD_KEYS + (
+    'morning_movements', 'afternoon_movements', 'evening_movements', 'night_movements',
+    'peak_activity_time', 'peak_activity_period'
+)
+
+# Standard deviation (minutes) of the circular activity density's Gaussian kernel
+KDE_BANDWIDTH_MINUTES = 30
+
+# Live-update sidecar written next to the dashboard page, and how often the page polls it
+SIDECAR_SUFFIX = '.data.js'
+SIDECAR_POLL_SECONDS = 30
+
+# Reports from different sources closer than this are the same movement
+MERGE_TOLERANCE_SECONDS = 60
+
+# Detections closer together than this are merged into one movement episode
+EPISODE_GAP_MINUTES = 30
+
+# Shortest run of days change-point detection treats as a sustained level
+CHANGE_POINT_MIN_DAYS = 2
+
+
+# plotly-latest is frozen at 1.x; typed-array ({dtype, bdata}) traces need >= 2.28
+PLOTLY_JS_URL = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+
+# Numeric trace arrays shorter than this stay as plain JSON lists
+TYPED_ARRAY_MIN_LENGTH = 16
+
+# Inline SVG chart size and plot margins (left, right, top, bottom) in pixels
+SVG_WIDTH = 900
+SVG_HEIGHT = 400
+SVG_MARGIN = (60, 30, 60, 50)
+
+# Charts with more points than this get aggregated or thinned SVG tooltips
+SVG_TOOLTIP_LIMIT = 200
+
+# Trace keys whose arrays plotly.js treats as labels, never typed arrays
+_TEXT_TRACE_KEYS = {'text', 'hovertext', 'customdata', 'ids', 'name', 'hovertemplate'}
+
+
+def _json_engine():
+    """Return the fastest available JSON engine for plotly serialization"""
+    try:
+        import orjson  # noqa: F401
+        return 'orjson'
+    except ImportError:
+        return 'json'
+
+
+def encode_typed_array(values):
+    """Encode a numeric array as a plotly.js typed-array spec, or None"""
+    array = np.asarray(values)
+    if array.ndim == 0 or array.size < TYPED_ARRAY_MIN_LENGTH or array.dtype.kind not in 'iuf':
+        return None
+    
+    if array.dtype.kind == 'f' and np.all(np.isfinite(array)) and np.all(array == np.round(array)):
+        array = array.astype(np.int64)
+    
+    if array.dtype.kind in 'iu':
+        # Pick the narrowest integer type plotly.js understands (no 64-bit)
+        low, high = (int(array.min()), int(array.max())) if array.size else (0, 0)
+        for dtype in ('u1', 'i1', 'u2', 'i2', 'u4', 'i4'):
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                break
+        else:
+            dtype = 'f8'
+    else:
+        dtype = 'f8'
+    array = np.ascontiguousarray(array, dtype='<' + dtype)
+    
+    spec = {
+        'dtype': dtype,
+        'bdata': base64.b64encode(array.tobytes()).decode('ascii')
+    }
+    if array.ndim > 1:
+        spec['shape'] = ','.join(str(n) for n in array.shape)
+    return spec
+
+
+def _encode_trace_arrays(obj):
+    """Recursively replace numeric arrays in a trace dict with typed-array specs"""
+    for key, value in obj.items():
+        if key in _TEXT_TRACE_KEYS:
+            continue
+        if isinstance(value, dict):
+            _encode_trace_arrays(value)
+        elif isinstance(value, (np.ndarray, list, tuple)) and not (
+                isinstance(value, (list, tuple)) and value and isinstance(value[0], (str, dict, bool))):
+            spec = encode_typed_array(value)
+            if spec is not None:
+                obj[key] = spec
+    return obj
+
+
+def figure_to_json(fig, typed_arrays=True, engine=None):
+    """Serialize a figure for embedding, optionally with base64 typed arrays
+    
+    Uses orjson when installed; typed_arrays=False gives plain JSON lists,
+    matching fig.to_json().
+    """
+    import plotly.io as pio
+    
+    engine = engine or _json_engine()
+    if not typed_arrays:
+        return pio.to_json(fig, validate=False, engine=engine)
+    
+    fig_dict = fig.to_plotly_json()
+    fig_dict['data'] = [_encode_trace_arrays(trace) for trace in fig_dict['data']]
+    return pio.json.to_json_plotly(fig_dict, engine=engine)
+
+
+def build_minute_cumsum(minutes_of_day):
+    """Build the cumulative per-minute detection count array (length 1441)
+
+    cumsum[m] is the number of detections strictly before minute m, so the
+    count in any bin [a, b) is cumsum[b] - cumsum[a].
+    """
+    minutes = np.asarray(minutes_of_day, dtype=np.int64)
+    counts = np.bincount(minutes, minlength=MINUTES_PER_DAY)
+    cumsum = np.zeros(MINUTES_PER_DAY + 1, dtype=np.int64)
+    np.cumsum(counts, out=cumsum[1:])
+    return cumsum
+
+
+def histogram_edges(bin_minutes=60, edges=None):
+    """Return validated bin edges in minutes of day, covering [0, 1440]"""
+    if edges is not None:
+        edges = np.asarray(edges, dtype=np.int64)
+        if edges.ndim != 1 or len(edges) < 2:
+            raise ValueError("Custom edges need at least two values")
+        if edges[0] < 0 or edges[-1] > MINUTES_PER_DAY or np.any(np.diff(edges) <= 0):
+            raise ValueError("Custom edges must be strictly increasing within 0..1440 minutes")
+        return edges
+    
+    if bin_minutes <= 0:
+        raise ValueError(f"Bin width must be positive, got {bin_minutes}")
+    edges = np.arange(0, MINUTES_PER_DAY, bin_minutes, dtype=np.int64)
+    return np.append(edges, MINUTES_PER_DAY)
+
+
+def histogram_from_cumsum(cumsum, bin_minutes=60, edges=None):
+    """Slice-and-difference the cumulative array into (edges, counts)"""
+    edges = histogram_edges(bin_minutes, edges)
+    return edges, np.diff(cumsum[edges])
+
+
+def circular_kde(minute_counts, bandwidth=KDE_BANDWIDTH_MINUTES):
+    """Circular (24-hour wrap-around) kernel density of detection times
+    
+    minute_counts holds detections per minute of day, shape (1440,) or
+    (patients, 1440). Each row is convolved with a Gaussian over circular
+    minute distance using one real FFT, so the cost depends on the grid,
+    not the number of detections, and 23:50 and 00:10 are 20 minutes apart.
+    Returns the density per minute (each non-empty row sums to 1).
+    """
+    counts = np.asarray(minute_counts, dtype=np.float64)
+    rows = np.atleast_2d(counts)
+    if rows.shape[-1] != MINUTES_PER_DAY:
+        raise ValueError(f"Expected {MINUTES_PER_DAY} minute bins, got {rows.shape[-1]}")
+    
+    offsets = np.arange(MINUTES_PER_DAY)
+    distance = np.minimum(offsets, MINUTES_PER_DAY - offsets)
+    kernel = np.exp(-0.5 * (distance / bandwidth) ** 2)
+    kernel /= kernel.sum()
+    
+    smoothed = np.fft.irfft(np.fft.rfft(rows, axis=1) * np.fft.rfft(kernel), n=MINUTES_PER_DAY, axis=1)
+    totals = rows.sum(axis=1, keepdims=True)
+    density = np.maximum(smoothed, 0) / np.where(totals > 0, totals, 1)
+    return density[0] if counts.ndim == 1 else density
+
+
+def circular_kde_batch(minutes_of_day, bandwidth=KDE_BANDWIDTH_MINUTES):
+    """Densities for many patients at once: one row per sequence of minutes of day"""
+    lengths = np.array([len(minutes) for minutes in minutes_of_day], dtype=np.int64)
+    flat = np.concatenate([np.asarray(m, dtype=np.int64) for m in minutes_of_day]) if len(lengths) else np.empty(0, np.int64)
+    patient = np.repeat(np.arange(len(lengths)), lengths)
+    counts = np.bincount(patient * MINUTES_PER_DAY + flat, minlength=len(lengths) * MINUTES_PER_DAY)
+    return circular_kde(counts.reshape(len(lengths), MINUTES_PER_DAY), bandwidth)
+
+
+def peak_activity_minute(density):
+    """Minute of day (or one per row) where the smoothed activity peaks"""
+    return np.argmax(density, axis=-1)
+
+
+def _nice_ticks(high, count=5):
+    """Round tick values from 0 up to at least high (about count ticks)"""
+    raw = max(float(high), 1.0) / count
+    magnitude = 10 ** np.floor(np.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    return np.arange(0, np.ceil(max(float(high), 1.0) / step) * step + step / 2, step)
+
+
+def _svg_scale(domain_low, domain_high, pixel_low, pixel_high):
+    """Vectorized linear map from data coordinates to SVG pixels"""
+    ratio = (pixel_high - pixel_low) / (domain_high - domain_low)
+    return lambda values: pixel_low + (np.asarray(values, dtype=np.float64) - domain_low) * ratio
+
+
+def _svg_polyline_points(xs, ys):
+    """Round a polyline to whole pixels, keeping each pixel column's envelope
+    
+    Runs of points in the same column collapse to their first, lowest,
+    highest and last y, so long series draw the same shape with at most
+    four points per column.
+    """
+    points = []
+    column = []
+    for px, py in zip(np.rint(xs).astype(int).tolist(), np.rint(ys).astype(int).tolist()):
+        if column and px != column[0][0]:
+            points.extend(_column_envelope(column))
+            column = []
+        column.append((px, py))
+    if column:
+        points.extend(_column_envelope(column))
+    return " ".join(f"{px},{py}" for px, py in points)
+
+
+def _column_envelope(column):
+    """First, min, max and last point of one pixel column, without repeats"""
+    ys = [py for _, py in column]
+    envelope = [column[0], (column[0][0], min(ys)), (column[0][0], max(ys)), column[-1]]
+    return [point for k, point in enumerate(envelope) if k == 0 or point != envelope[k - 1]]
+
+
+def _svg_markers(points, fill, radius=6, grid=1):
+    """One <path> drawing a circle at whole-pixel points
+    
+    Points falling in the same grid x grid pixel cell share one marker;
+    with radius-6 markers a grid of 2-3 pixels is visually lossless.
+    """
+    centers = {(round(px / grid), round(py / grid)): (round(px), round(py)) for px, py in points}.values()
+    d = "".join(f"M{px - radius} {py}a{radius} {radius} 0 1 0 {2 * radius} 0"
+                f"a{radius} {radius} 0 1 0 -{2 * radius} 0" for px, py in centers)
+    return f'<path d="{d}" fill="{fill}"/>'
+
+
+def _svg_chart(title, title_color, background, grid_color, x_ticks, y_ticks, x_label, y_label, body,
+               height=SVG_HEIGHT):
+    """Wrap pre-rendered SVG elements in a titled, gridded chart frame
+    
+    x_ticks / y_ticks are (pixel, label) pairs; body is a list of SVG
+    element strings already in pixel coordinates.
+    """
+    left, right, top, bottom = SVG_MARGIN
+    plot_bottom = height - bottom
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {SVG_WIDTH} {height}" '
+        f'font-family="Arial, sans-serif" font-size="13" fill="#374151" role="img" aria-label="{html.escape(title)}">',
+        f'<rect x="{left}" y="{top}" width="{SVG_WIDTH - left - right}" height="{plot_bottom - top}" fill="{background}"/>',
+        f'<text x="{SVG_WIDTH / 2}" y="32" text-anchor="middle" font-size="20" font-weight="bold" '
+        f'fill="{title_color}">{html.escape(title)}</text>',
+    ]
+    for x, label in x_ticks:
+        parts.append(f'<line x1="{x:.0f}" y1="{top}" x2="{x:.0f}" y2="{plot_bottom}" stroke="{grid_color}"/>'
+                     f'<text x="{x:.0f}" y="{plot_bottom + 18}" text-anchor="middle">{label}</text>')
+    for y, label in y_ticks:
+        parts.append(f'<line x1="{left}" y1="{y:.0f}" x2="{SVG_WIDTH - right}" y2="{y:.0f}" stroke="{grid_color}"/>'
+                     f'<text x="{left - 8}" y="{y + 4:.0f}" text-anchor="end">{label}</text>')
+    parts.extend(body)
+    parts.append(f'<text x="{(left + SVG_WIDTH - right) / 2}" y="{height - 14}" text-anchor="middle">{x_label}</text>')
+    parts.append(f'<text transform="translate(16 {(top + plot_bottom) / 2}) rotate(-90)" text-anchor="middle">{y_label}</text>')
+    parts.append('</svg>')
+    return "".join(parts)
+
+
+# Display colors and icons per interval status
+STATUS_COLORS = {'normal': '#10b981', 'monitor': '#f59e0b', 'concern': '#ef4444'}
+STATUS_ICONS = {'normal': '🟢', 'monitor': '🟡', 'concern': '🔴'}
+
+
+class ThresholdRules:
+    """Declarative clinical protocol compiled into vectorized evaluators
+    
+    One rule set (per clinic or per patient) drives interval statuses, the
+    compliance ladder, hourly activity levels and live alerts, so every
+    dashboard section agrees. Evaluators take whole arrays and use
+    np.searchsorted / np.select instead of per-row branching.
+    
+    monitor_minutes / concern_minutes: an interval strictly above the
+        threshold gets that status.
+    compliance_ladder: (label, max_concern_intervals, max_interval_minutes)
+        rows checked in order; None means no limit, first match wins.
+    activity_levels: (max_hourly_rate, label, color) rows in ascending
+        order; the last row's rate is ignored (catch-all).
+    """
+    
+    def __init__(self, monitor_minutes=60, concern_minutes=120, compliance_ladder=None,
+                 activity_levels=None, name='Default protocol'):
+        if not 0 < monitor_minutes < concern_minutes:
+            raise ValueError("Thresholds must satisfy 0 < monitor_minutes < concern_minutes")
+        self.name = name
+        self.monitor_minutes = monitor_minutes
+        self.concern_minutes = concern_minutes
+        self.compliance_ladder = tuple(tuple(row) for row in (compliance_ladder or (
+            ('Excellent', 0, concern_minutes),
+            ('Good', 0, None),
+            ('Monitor', 2, None),
+            ('Attention Needed', None, None),
+        )))
+        self.activity_levels = tuple(tuple(row) for row in (activity_levels or (
+            (0, 'No Activity', '#ef4444'),
+            (2, 'Low Activity', '#f59e0b'),
+            (4, 'Normal Activity', '#10b981'),
+            (None, 'High Activity', '#3b82f6'),
+        )))
+        
+        # Compiled lookup tables
+        self._interval_edges = np.array([monitor_minutes, concern_minutes], dtype=np.float64)
+        self._interval_labels = np.array(['normal', 'monitor', 'concern'])
+        self._activity_edges = np.array([row[0] for row in self.activity_levels[:-1]], dtype=np.float64)
+        self._activity_labels = np.array([row[1] for row in self.activity_levels])
+        self._activity_colors = np.array([row[2] for row in self.activity_levels])
+    
+    @classmethod
+    def from_dict(cls, config):
+        """Build a rule set from a plain (e.g. JSON-loaded) configuration"""
+        return cls(**config)
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'monitor_minutes': self.monitor_minutes,
+            'concern_minutes': self.concern_minutes,
+            'compliance_ladder': [list(row) for row in self.compliance_ladder],
+            'activity_levels': [list(row) for row in self.activity_levels],
+        }
+    
+    @property
+    def alert_thresholds(self):
+        """(level, minutes) pairs for live silence alerts"""
+        return (('monitor', self.monitor_minutes), ('concern', self.concern_minutes))
+    
+    def interval_codes(self, minutes):
+        """0 = normal, 1 = monitor, 2 = concern for each interval"""
+        return np.searchsorted(self._interval_edges, np.asarray(minutes, dtype=np.float64), side='left')
+    
+    def classify_intervals(self, minutes):
+        """Status label for each interval"""
+        return self._interval_labels[self.interval_codes(minutes)]
+    
+    def classify_activity(self, counts, bin_minutes=60):
+        """(colors, labels) for each bin count, judged by equivalent hourly rate"""
+        rates = np.asarray(counts, dtype=np.float64) * 60 / bin_minutes
+        index = np.searchsorted(self._activity_edges, rates, side='left')
+        return self._activity_colors[index], self._activity_labels[index]
+    
+    def compliance(self, concern_intervals, max_intervals):
+        """Compliance label for each (concern count, max interval) pair"""
+        concern_intervals = np.asarray(concern_intervals)
+        max_intervals = np.asarray(max_intervals)
+        conditions = []
+        for _, max_concern, max_interval in self.compliance_ladder[:-1]:
+            condition = np.ones(concern_intervals.shape, dtype=bool)
+            if max_concern is not None:
+                condition &= concern_intervals <= max_concern
+            if max_interval is not None:
+                condition &= max_intervals <= max_interval
+            conditions.append(condition)
+        labels = [row[0] for row in self.compliance_ladder]
+        return np.select(conditions, labels[:-1], default=labels[-1])
+    
+    def evaluate_patients(self, interval_arrays):
+        """Re-evaluate many patients' intervals in one vectorized pass
+        
+        interval_arrays is a sequence of per-patient interval arrays
+        (minutes). Returns per-patient arrays of status counts, max
+        interval and compliance labels.
+        """
+        lengths = np.array([len(a) for a in interval_arrays], dtype=np.int64)
+        values = np.concatenate([np.asarray(a, dtype=np.float64) for a in interval_arrays]) if len(lengths) else np.empty(0)
+        return self.evaluate_grouped(values, np.repeat(np.arange(len(lengths)), lengths), len(lengths))
+    
+    def evaluate_grouped(self, values, patient, n_patients):
+        """evaluate_patients() over one flat interval array
+        
+        patient gives each interval's patient index (0 .. n_patients-1);
+        intervals need not be contiguous per patient.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        codes = self.interval_codes(values)
+        counts = np.zeros((n_patients, 3), dtype=np.int64)
+        np.add.at(counts, (patient, codes), 1)
+        max_intervals = np.zeros(n_patients)
+        np.maximum.at(max_intervals, patient, np.round(values))
+        
+        return {
+            'normal_intervals': counts[:, 0],
+            'monitor_intervals': counts[:, 1],
+            'concern_intervals': counts[:, 2],
+            'max_interval': max_intervals,
+            'compliance': self.compliance(counts[:, 2], max_intervals)
+        }
+
+
+DEFAULT_RULES = ThresholdRules()
+
+
+def format_minute_of_day(minute):
+    """Format minutes since midnight as HH:MM"""
+    return f"{int(minute) // 60:02d}:{int(minute) % 60:02d}"
+
+
+class TimeParseError(ValueError):
+    """A detection token that could not be parsed, with a rejection category"""
+    
+    def __init__(self, category, message):
+        super().__init__(message)
+        self.category = category
+
+
+def _clock_fields(text):
+    """Split 'H' or 'H:MM' into integer (hour, minute)"""
+    parts = text.split(':') if ':' in text else [text, '00']
+    if len(parts) != 2:
+        raise TimeParseError('malformed', f"expected H or H:MM, got '{text}'")
+    try:
+        return int(parts[0]), int(parts[1])
+    except ValueError:
+        raise TimeParseError('invalid_number', f"non-numeric hour or minute in '{text}'") from None
+
+
+class ParseErrorReport:
+    """Structured, rate-limited record of rejected input tokens
+    
+    Keeps a count per rejection category, the first max_samples rejected
+    tokens with their 1-based positions, and the total. Only the first
+    max_logged rejections are printed; the rest are summarized in a single
+    line by log_summary(), so corrupted exports don't flood the console.
+    """
+    
+    def __init__(self, max_samples=20, max_logged=5, verbose=True):
+        self.max_samples = max_samples
+        self.max_logged = max_logged
+        self.verbose = verbose
+        self.total_rejected = 0
+        self.counts = {}
+        self.samples = []
+    
+    def add(self, position, token, error):
+        """Record one rejected token"""
+        category = getattr(error, 'category', 'invalid')
+        self.total_rejected += 1
+        self.counts[category] = self.counts.get(category, 0) + 1
+        if len(self.samples) < self.max_samples:
+            self.samples.append({'position': position, 'token': token, 'category': category, 'message': str(error)})
+        if self.verbose and self.total_rejected <= self.max_logged:
+            print(f"⚠️ Warning: Could not parse time '{token}' (#{position}): {error}")
+    
+    def log_summary(self):
+        """Print one line covering rejections beyond the logging limit"""
+        suppressed = self.total_rejected - self.max_logged
+        if self.verbose and suppressed > 0:
+            breakdown = ", ".join(f"{category}: {count}" for category, count in sorted(self.counts.items()))
+            print(f"⚠️ Warning: {suppressed} more unparseable times suppressed "
+                  f"({self.total_rejected} rejected in total; {breakdown})")
+    
+    def to_dict(self):
+        return {
+            'total_rejected': self.total_rejected,
+            'counts': dict(self.counts),
+            'samples': list(self.samples),
+        }
+
+
+# Day periods as (name, start hour, end hour), matching the pattern summary
+DAY_PERIODS = (('night', 0, 6), ('morning', 6, 12), ('afternoon', 12, 18), ('evening', 18, 24))
+
+# Timeline background shading per day period
+PERIOD_BACKGROUNDS = {
+    'night': 'rgba(59, 130, 246, 0.1)',
+    'morning': 'rgba(16, 185, 129, 0.1)',
+    'afternoon': 'rgba(245, 158, 11, 0.1)',
+    'evening': 'rgba(139, 92, 246, 0.1)',
+}
+
+
+class ActivityBaseline:
+    """This pregnancy's own activity pattern as exponentially weighted statistics
+    
+    Keeps an exponentially weighted mean and variance of the daily count for
+    every hour-of-day bucket and every day period. Each day's update is a
+    fixed-size vector operation (constant work per bucket); add_detection()
+    plus close_day() make it constant time per detection. A bucket is flagged
+    as low when its z-score against the baseline falls below -z_threshold,
+    once at least min_days have been learned.
+    """
+    
+    def __init__(self, alpha=0.2, z_threshold=2.0, min_days=3, min_variance=1.0):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_days = min_days
+        self.min_variance = min_variance
+        self.days = 0
+        self.hour_mean = np.zeros(24)
+        self.hour_var = np.zeros(24)
+        self.period_mean = np.zeros(len(DAY_PERIODS))
+        self.period_var = np.zeros(len(DAY_PERIODS))
+        self._pending = np.zeros(24, dtype=np.int64)
+    
+    @staticmethod
+    def period_counts(hourly_counts):
+        """Sum 24 hourly counts into DAY_PERIODS buckets"""
+        hourly_counts = np.asarray(hourly_counts, dtype=np.float64)
+        return np.array([hourly_counts[start:end].sum() for _, start, end in DAY_PERIODS])
+    
+    def _update(self, mean, var, values):
+        if self.days == 0:
+            mean[:] = values
+            var[:] = 0
+        else:
+            diff = values - mean
+            increment = self.alpha * diff
+            mean += increment
+            var[:] = (1 - self.alpha) * (var + diff * increment)
+    
+    def update_day(self, hourly_counts):
+        """Fold one full day of 24 hourly counts into the baseline
+        
+        Only pass a closed day, once: a partial day (e.g. today's
+        day_hourly_counts before midnight) lowers the expected counts.
+        """
+        hourly_counts = np.asarray(hourly_counts, dtype=np.float64)
+        self._update(self.hour_mean, self.hour_var, hourly_counts)
+        self._update(self.period_mean, self.period_var, self.period_counts(hourly_counts))
+        self.days += 1
+    
+    def add_detection(self, hour):
+        """Count a live detection towards the current (open) day"""
+        self._pending[hour] += 1
+    
+    def close_day(self):
+        """Fold the detections added since the last close into the baseline"""
+        self.update_day(self._pending)
+        self._pending[:] = 0
+    
+    def compare(self, hourly_counts, through_hour=23):
+        """Z-scores of a day's counts against the baseline and the low buckets
+        
+        Hours after through_hour (not yet observed today) are never flagged,
+        and a period is only judged once it has fully elapsed.
+        """
+        hourly_counts = np.asarray(hourly_counts, dtype=np.float64)
+        hour_z = (hourly_counts - self.hour_mean) / np.sqrt(np.maximum(self.hour_var, self.min_variance))
+        period_z = ((self.period_counts(hourly_counts) - self.period_mean)
+                    / np.sqrt(np.maximum(self.period_var, self.min_variance)))
+        
+        ready = self.days >= self.min_days
+        observed = np.arange(24) <= through_hour
+        elapsed = np.array([end - 1 <= through_hour for _, _, end in DAY_PERIODS])
+        return {
+            'days_learned': self.days,
+            'expected_hourly': self.hour_mean.round(2).tolist(),
+            'hour_z': hour_z.round(2).tolist(),
+            'low_hours': np.flatnonzero(ready & observed & (hour_z <= -self.z_threshold)).tolist() if ready else [],
+            'low_periods': [DAY_PERIODS[i][0] for i in np.flatnonzero(elapsed & (period_z <= -self.z_threshold))] if ready else [],
+        }
+    
+    def save(self, path):
+        """Persist the baseline as a small .npz file"""
+        np.savez(path,
+                 params=np.array([self.alpha, self.z_threshold, self.min_days, self.min_variance, self.days]),
+                 hours=np.stack([self.hour_mean, self.hour_var]),
+                 periods=np.stack([self.period_mean, self.period_var]),
+                 pending=self._pending)
+    
+    @classmethod
+    def load(cls, path):
+        """Restore a baseline written by save()"""
+        with np.load(path) as state:
+            alpha, z_threshold, min_days, min_variance, days = state['params'].tolist()
+            baseline = cls(alpha, z_threshold, int(min_days), min_variance)
+            baseline.days = int(days)
+            baseline.hour_mean, baseline.hour_var = state['hours'].copy()
+            baseline.period_mean, baseline.period_var = state['periods'].copy()
+            baseline._pending = state['pending'].copy()
+        return baseline
+
+
+class ActivityCube:
+    """Materialized day x time-bin detection counts
+    
+    Counts live in one compact integer matrix with a row per monitored day.
+    Adding detections only touches the row of the day they belong to, so a
+    multi-week cube never needs to be recomputed when a new day arrives.
+    """
+    
+    def __init__(self, bin_minutes=60, dtype=np.int32):
+        if bin_minutes <= 0 or MINUTES_PER_DAY % bin_minutes:
+            raise ValueError(f"Bin width must divide 1440 minutes, got {bin_minutes}")
+        self.bin_minutes = bin_minutes
+        self.days = []
+        self._rows = {}
+        self._counts = np.zeros((8, MINUTES_PER_DAY // bin_minutes), dtype=dtype)
+        self.frozen = False
+    
+    def freeze(self):
+        """Make the cube read-only (e.g. once it is part of an AnalysisResult)"""
+        self.frozen = True
+        self.days = tuple(self.days)
+        self._counts.flags.writeable = False
+    
+    def _row(self, day):
+        """Return the row index for a day, appending a new row if needed"""
+        if self.frozen:
+            raise ValueError("ActivityCube is frozen and cannot take new detections")
+        row = self._rows.get(day)
+        if row is None:
+            row = len(self.days)
+            if row == len(self._counts):
+                # Grow capacity geometrically so appends stay amortized O(1)
+                grown = np.zeros((2 * len(self._counts), self._counts.shape[1]), dtype=self._counts.dtype)
+                grown[:row] = self._counts
+                self._counts = grown
+            self._rows[day] = row
+            self.days.append(day)
+        return row
+    
+    def add_detection(self, day, minute_of_day):
+        """Count a single detection at minutes since midnight on a day"""
+        row = self._row(day)
+        self._counts[row, int(minute_of_day) // self.bin_minutes] += 1
+    
+    def add_day(self, day, minutes_of_day):
+        """Add a batch of detections (minutes since midnight) for one day"""
+        bins = np.asarray(minutes_of_day, dtype=np.int64) // self.bin_minutes
+        row = self._row(day)
+        self._counts[row] += np.bincount(bins, minlength=self._counts.shape[1]).astype(self._counts.dtype)
+    
+    @property
+    def counts(self):
+        """Day x bin count matrix (a view, one row per day in arrival order)"""
+        return self._counts[:len(self.days)]
+    
+    def day_totals(self):
+        """Total detections per day"""
+        return self.counts.sum(axis=1)
+    
+    def bin_labels(self):
+        """HH:MM label for the start of each time bin"""
+        return [format_minute_of_day(m) for m in range(0, MINUTES_PER_DAY, self.bin_minutes)]
+
+
+def add_days(cube, movements):
+    """Add movement records to an ActivityCube with one add_day() per day"""
+    days = np.array([m['day'] for m in movements], dtype=np.int64)
+    minutes = np.array([m['hour'] * 60 + m['minute'] for m in movements], dtype=np.int64)
+    order = np.argsort(days, kind='stable')
+    day_values, starts = np.unique(days[order], return_index=True)
+    for day, day_minutes in zip(day_values.tolist(), np.split(minutes[order], starts[1:])):
+        cube.add_day(day, day_minutes)
+    return cube
+
+
+def fit_cosinor(counts, bin_minutes=60, period_hours=24):
+    """Fit MESOR + amplitude * cos(2pi (t - acrophase) / period) to count rows
+    
+    counts is (bins,) or (rows, bins) detections per time bin, one row per
+    patient or per day. The linearized model MESOR + b cos(wt) + g sin(wt)
+    shares one design matrix, so every row is solved in a single
+    np.linalg.lstsq call with the rows as right-hand sides. Returns arrays
+    (scalars for 1-D input) of mesor and amplitude in detections per hour,
+    acrophase_hours (time of the fitted peak) and r_squared.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    rates = np.atleast_2d(counts) * (60 / bin_minutes)
+    hours = (np.arange(rates.shape[1]) + 0.5) * bin_minutes / 60
+    angle = 2 * np.pi * hours / period_hours
+    design = np.column_stack([np.ones_like(angle), np.cos(angle), np.sin(angle)])
+    
+    coefficients = np.linalg.lstsq(design, rates.T, rcond=None)[0]
+    mesor, beta, gamma = coefficients
+    residual = ((rates.T - design @ coefficients) ** 2).sum(axis=0)
+    variation = ((rates - rates.mean(axis=1, keepdims=True)) ** 2).sum(axis=1)
+    
+    fits = {
+        'mesor': mesor,
+        'amplitude': np.hypot(beta, gamma),
+        'acrophase_hours': np.arctan2(gamma, beta) * period_hours / (2 * np.pi) % period_hours,
+        'r_squared': np.where(variation > 0, 1 - residual / np.where(variation > 0, variation, 1), 0.0)
+    }
+    if counts.ndim == 1:
+        fits = {key: float(value[0]) for key, value in fits.items()}
+    return fits
+
+
+def cosinor_curve(mesor, amplitude, acrophase_hours, hours, period_hours=24):
+    """Evaluate a fitted cosinor (detections per hour) at the given hours"""
+    return mesor + amplitude * np.cos(2 * np.pi * (np.asarray(hours) - acrophase_hours) / period_hours)
+
+
+def _jit(kernel):
+    """Numba-compile a loop kernel when that backend is active, else None"""
+    return numba.njit(cache=True, nogil=True)(kernel) if KERNEL_BACKEND == 'numba' else None
+
+
+def _rollover_intervals_kernel(timestamps_us):
+    intervals = np.empty(max(len(timestamps_us) - 1, 0), dtype=np.float64)
+    for i in range(len(intervals)):
+        minutes = (timestamps_us[i + 1] - timestamps_us[i]) / 60e6
+        intervals[i] = minutes + MINUTES_PER_DAY if minutes < 0 else minutes
+    return intervals
+
+
+def _episode_runs_kernel(minutes, gap_minutes):
+    n = len(minutes)
+    starts = np.empty(n, dtype=np.int64)
+    ends = np.empty(n, dtype=np.int64)
+    runs = 0
+    starts[0] = 0
+    for i in range(1, n):
+        if minutes[i] - minutes[i - 1] > gap_minutes:
+            ends[runs] = i - 1
+            runs += 1
+            starts[runs] = i
+    ends[runs] = n - 1
+    runs += 1
+    return starts[:runs], ends[:runs], ends[:runs] - starts[:runs] + 1
+
+
+def _moving_average_kernel(values, window):
+    averages = np.empty(len(values), dtype=np.float64)
+    cumsum = np.zeros(len(values) + 1, dtype=np.float64)
+    for i in range(len(values)):
+        cumsum[i + 1] = cumsum[i] + values[i]
+    for end in range(1, len(values) + 1):
+        start = max(end - window, 0)
+        averages[end - 1] = (cumsum[end] - cumsum[start]) / (end - start)
+    return averages
+
+
+def _refractory_onsets_kernel(indices, last_onset, refractory):
+    kept = np.empty(len(indices), dtype=np.int64)
+    count = 0
+    for index in indices:
+        if last_onset < 0 or index - last_onset >= refractory:
+            kept[count] = index
+            count += 1
+            last_onset = index
+    return kept[:count], last_onset
+
+
+def _pelt_kernel(cumsum, cumsum_sq, penalty, min_size):
+    n, features = cumsum.shape[0] - 1, cumsum.shape[1]
+    best_cost = np.full(n + 1, np.inf)
+    best_cost[0] = -penalty
+    previous = np.zeros(n + 1, dtype=np.int64)
+    candidates = np.empty(n + 1, dtype=np.int64)
+    costs = np.empty(n + 1, dtype=np.float64)
+    count = 0
+    for t in range(min_size, n + 1):
+        candidates[count] = t - min_size
+        count += 1
+        for j in range(count):
+            s = candidates[j]
+            cost = best_cost[s]
+            for f in range(features):
+                total = cumsum[t, f] - cumsum[s, f]
+                cost += cumsum_sq[t, f] - cumsum_sq[s, f] - total * total / (t - s)
+            costs[j] = cost
+            if cost + penalty < best_cost[t]:
+                best_cost[t] = cost + penalty
+                previous[t] = s
+        kept = 0
+        for j in range(count):
+            if costs[j] <= best_cost[t]:
+                candidates[kept] = candidates[j]
+                kept += 1
+        count = kept
+    return previous
+
+
+_rollover_intervals_jit = _jit(_rollover_intervals_kernel)
+_episode_runs_jit = _jit(_episode_runs_kernel)
+_moving_average_jit = _jit(_moving_average_kernel)
+_refractory_onsets_jit = _jit(_refractory_onsets_kernel)
+_pelt_jit = _jit(_pelt_kernel)
+
+
+def rollover_intervals(timestamps_us):
+    """Minutes between consecutive int64 microsecond timestamps
+    
+    A negative gap (a clock time earlier than the previous one on the same
+    nominal day) is moved forward by one day.
+    """
+    timestamps_us = np.ascontiguousarray(timestamps_us, dtype=np.int64)
+    if _rollover_intervals_jit is not None:
+        return _rollover_intervals_jit(timestamps_us)
+    intervals = np.diff(timestamps_us) / 60e6
+    intervals[intervals < 0] += MINUTES_PER_DAY
+    return intervals
+
+
+def refractory_onsets(indices, last_onset, refractory):
+    """Keep rising-edge indices at least refractory apart (greedy, in order)
+    
+    last_onset is the previous kept index, or -1 for none. Returns the kept
+    indices and the new last_onset.
+    """
+    indices = np.ascontiguousarray(indices, dtype=np.int64)
+    if _refractory_onsets_jit is not None:
+        kept, last_onset = _refractory_onsets_jit(indices, last_onset, refractory)
+        return kept, int(last_onset)
+    kept = []
+    for index in indices.tolist():
+        if last_onset < 0 or index - last_onset >= refractory:
+            kept.append(index)
+            last_onset = index
+    return np.asarray(kept, dtype=np.int64), last_onset
+
+
+def cluster_episodes(minutes, gap_minutes):
+    """Group sorted detection times into episodes in one vectorized pass
+    
+    Consecutive detections no more than gap_minutes apart share an episode.
+    Returns (start_index, end_index, count) arrays, one entry per episode.
+    """
+    minutes = np.ascontiguousarray(minutes, dtype=np.float64)
+    if len(minutes) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    if _episode_runs_jit is not None:
+        return _episode_runs_jit(minutes, float(gap_minutes))
+    
+    breaks = np.flatnonzero(np.diff(minutes) > gap_minutes) + 1
+    start_index = np.concatenate(([0], breaks))
+    end_index = np.concatenate((breaks - 1, [len(minutes) - 1]))
+    return start_index, end_index, end_index - start_index + 1
+
+
+def _causal_moving_average(values, window):
+    """Trailing moving average; the first samples average what is available"""
+    if _moving_average_jit is not None:
+        return _moving_average_jit(np.ascontiguousarray(values, dtype=np.float64), window)
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (cumsum[ends] - cumsum[starts]) / (ends - starts)
+
+
+def detect_change_points(values, penalty=None, min_size=CHANGE_POINT_MIN_DAYS):
+    """Indices where the mean of a (days x features) series shifts
+    
+    Exact PELT segmentation under a Gaussian mean-shift cost: candidate
+    segment starts that can no longer be optimal are pruned. The cost is
+    linear in the number of days while the level keeps changing, but a
+    series with no change prunes nothing and costs quadratic time (well
+    under a second for a pregnancy's worth of days). Each feature is
+    centered and scaled by a robust estimate of its day-to-day noise so one
+    penalty (default 2 * features * log(days)) fits all; constant features
+    carry no information and are dropped. Returns the first index of every
+    segment after the first.
+    
+    >>> rng = np.random.default_rng(0)
+    >>> noisy = rng.normal(size=28)
+    >>> detect_change_points(np.column_stack((noisy, np.full(28, 1.2)))).tolist()
+    []
+    >>> detect_change_points(noisy).tolist()
+    []
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    if len(values) < 2 * min_size:
+        return np.empty(0, dtype=np.int64)
+    values = values[:, np.ptp(values, axis=0) > 0]
+    n, features = values.shape
+    if features == 0:
+        return np.empty(0, dtype=np.int64)
+    
+    # MAD of day-to-day differences is unaffected by the level shifts being looked for
+    noise = np.median(np.abs(np.diff(values, axis=0)), axis=0) / (0.6745 * np.sqrt(2))
+    scaled = (values - values.mean(axis=0)) / np.where(noise > 0, noise, values.std(axis=0))
+    cumsum = np.vstack((np.zeros(features), np.cumsum(scaled, axis=0)))
+    cumsum_sq = np.vstack((np.zeros(features), np.cumsum(scaled ** 2, axis=0)))
+    penalty = 2 * features * np.log(n) if penalty is None else float(penalty)
+    
+    if _pelt_jit is not None:
+        previous = _pelt_jit(cumsum, cumsum_sq, penalty, min_size)
+    else:
+        best_cost = np.full(n + 1, np.inf)
+        best_cost[0] = -penalty
+        previous = np.zeros(n + 1, dtype=np.int64)
+        candidates = np.empty(0, dtype=np.int64)
+        for t in range(min_size, n + 1):
+            candidates = np.append(candidates, t - min_size)
+            totals = cumsum[t] - cumsum[candidates]
+            costs = best_cost[candidates] + (
+                cumsum_sq[t] - cumsum_sq[candidates] - totals ** 2 / (t - candidates)[:, None]).sum(axis=1)
+            best = np.argmin(costs)
+            best_cost[t] = costs[best] + penalty
+            previous[t] = candidates[best]
+            candidates = candidates[costs <= best_cost[t]]
+    
+    change_points = []
+    t = previous[n]
+    while t > 0:
+        change_points.append(t)
+        t = previous[t]
+    return np.array(change_points[::-1], dtype=np.int64)
+
+
+class AccelerometerIngestor:
+    """Turn raw wearable accelerometer samples into movement detection times
+    
+    Samples are read from a memory-mapped binary file (interleaved
+    little-endian channels) or a CSV file and processed in fixed-size
+    chunks, so days of high-frequency data never have to fit in RAM.
+    Each chunk is filtered with vectorized NumPy operations:
+    
+    1. vector magnitude across channels
+    2. high-pass by subtracting a trailing moving-average baseline
+    3. smoothed activity envelope of the high-pass signal
+    4. threshold onsets, merged by a refractory period
+    
+    The trailing filter context is carried between chunks so results do not
+    depend on the chunk size.
+    
+    CSV files use the named columns as channels, or by default the last
+    `channels` columns, so leading timestamp or index columns are skipped.
+    
+    With verbose=False, detect() does not print its throughput (read it
+    from samples_per_second instead).
+    """
+    
+    def __init__(self, sample_rate=100.0, channels=3, dtype='<f4', threshold=0.05,
+                 baseline_seconds=2.0, envelope_seconds=0.5, refractory_seconds=30.0,
+                 chunk_seconds=600.0, columns=None, verbose=True):
+        if columns is not None and len(columns) != channels:
+            raise ValueError(f"Expected {channels} channel columns, got {len(columns)}")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.columns = list(columns) if columns is not None else None
+        self.dtype = np.dtype(dtype)
+        self.threshold = threshold
+        self.baseline_window = max(1, int(round(baseline_seconds * sample_rate)))
+        self.envelope_window = max(1, int(round(envelope_seconds * sample_rate)))
+        self.refractory_samples = int(round(refractory_seconds * sample_rate))
+        self.chunk_samples = max(1, int(round(chunk_seconds * sample_rate)))
+        self.verbose = verbose
+        self.samples_processed = 0
+        self.elapsed_seconds = 0.0
+    
+    @property
+    def samples_per_second(self):
+        """Ingestion throughput of the last detect() call"""
+        return self.samples_processed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+    
+    def _iter_chunks(self, path, fmt):
+        """Yield (n_samples, channels) float64 chunks from a sample file"""
+        if fmt == 'csv':
+            for frame in pd.read_csv(path, chunksize=self.chunk_samples, memory_map=True, usecols=self.columns):
+                if self.columns is None:
+                    if frame.shape[1] < self.channels:
+                        raise ValueError(f"{path} has {frame.shape[1]} columns, expected at least {self.channels} channels")
+                    frame = frame.iloc[:, -self.channels:]
+                else:
+                    frame = frame[self.columns]
+                non_numeric = [name for name, dtype in frame.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+                if non_numeric:
+                    raise ValueError(f"Channel column(s) {', '.join(map(str, non_numeric))} in {path} are not numeric")
+                yield frame.to_numpy(np.float64)
+            return
+        
+        if os.path.getsize(path) == 0:
+            return
+        samples = np.memmap(path, dtype=self.dtype, mode='r')
+        samples = samples[:len(samples) - len(samples) % self.channels].reshape(-1, self.channels)
+        for start in range(0, len(samples), self.chunk_samples):
+            yield np.asarray(samples[start:start + self.chunk_samples], dtype=np.float64)
+    
+    def detect_onsets(self, path, fmt=None):
+        """Return sample indices where movement episodes start"""
+        fmt = fmt or ('csv' if str(path).lower().endswith('.csv') else 'binary')
+        context = self.baseline_window + self.envelope_window
+        tail = np.empty(0)
+        was_active = False
+        last_onset = -1
+        onsets = []
+        
+        start = time.perf_counter()
+        self.samples_processed = 0
+        
+        for chunk in self._iter_chunks(path, fmt):
+            magnitude = np.sqrt(np.einsum('ij,ij->i', chunk, chunk)) if chunk.shape[1] > 1 else np.abs(chunk[:, 0])
+            extended = np.concatenate((tail, magnitude))
+            
+            high_pass = extended - _causal_moving_average(extended, self.baseline_window)
+            envelope = _causal_moving_average(np.abs(high_pass), self.envelope_window)[len(tail):]
+            
+            active = envelope > self.threshold
+            rising = active & ~np.concatenate(([was_active], active[:-1]))
+            
+            # Only onsets (not samples) are visited by the sequential refractory merge
+            kept, last_onset = refractory_onsets(np.flatnonzero(rising) + self.samples_processed,
+                                                 last_onset, self.refractory_samples)
+            onsets.append(kept)
+            
+            if len(active):
+                was_active = bool(active[-1])
+            tail = extended[-context:]
+            self.samples_processed += len(magnitude)
+        
+        self.elapsed_seconds = time.perf_counter() - start
+        return np.concatenate(onsets) if onsets else np.empty(0, dtype=np.int64)
+    
+    def detect(self, path, start_time=None, fmt=None):
+        """Detect movements in a sample file and return their datetimes"""
+        start_time = start_time or datetime(2024, 1, 1)
+        onsets = self.detect_onsets(path, fmt)
+        
+        if self.verbose:
+            print(f"📈 Ingested {self.samples_processed:,} samples in {self.elapsed_seconds:.2f}s "
+                  f"({self.samples_per_second:,.0f} samples/s), {len(onsets)} detections")
+        
+        return [start_time + timedelta(seconds=index / self.sample_rate) for index in onsets.tolist()]
+
+
+class DetectionStreamMerger:
+    """Merge time-ordered detection streams from several sources into one
+    
+    Each source (app taps, wearable, a partner's phone, ...) yields datetimes
+    in time order, so the streams are combined with a lazy k-way heap merge
+    (heapq.merge) in O(n log k) instead of concatenating and re-sorting.
+    A detection from a different source within tolerance_seconds of the
+    first detection of the current group is treated as the same movement
+    and only adds its source to the group; a source's own detections are
+    never collapsed. Counters describe the last merge() run.
+    """
+    
+    def __init__(self, tolerance_seconds=MERGE_TOLERANCE_SECONDS):
+        self.tolerance = timedelta(seconds=tolerance_seconds)
+        self.source_counts = {}
+        self.collapsed_duplicates = 0
+    
+    def _ordered(self, source, timestamps):
+        """Tag a source's detections, rejecting streams that go back in time"""
+        previous = None
+        for timestamp in timestamps:
+            if previous is not None and timestamp < previous:
+                raise ValueError(f"Detections from {source!r} are not in time order "
+                                 f"({timestamp} after {previous})")
+            previous = timestamp
+            self.source_counts[source] += 1
+            yield timestamp, source
+    
+    def merge(self, streams):
+        """Yield (timestamp, sources) per merged detection, lazily and in time order
+        
+        streams maps source name -> iterable of datetimes. timestamp is the
+        earliest report of the movement and sources names every source that
+        reported it, in the order they did.
+        """
+        self.source_counts = {source: 0 for source in streams}
+        self.collapsed_duplicates = 0
+        merged = heapq.merge(*(self._ordered(source, timestamps) for source, timestamps in streams.items()),
+                             key=lambda detection: detection[0])
+        
+        group_start, group_sources = None, []
+        for timestamp, source in merged:
+            if group_sources and timestamp - group_start <= self.tolerance and source not in group_sources:
+                group_sources.append(source)
+                self.collapsed_duplicates += 1
+                continue
+            if group_sources:
+                yield group_start, tuple(group_sources)
+            group_start, group_sources = timestamp, [source]
+        if group_sources:
+            yield group_start, tuple(group_sources)
+
+
+def _freeze(value):
+    """Freeze nested stats for sharing across threads
+    
+    Dicts and lists are copied into mappingproxies and tuples, but NumPy
+    arrays and ActivityCubes are frozen in place (write flag cleared,
+    cube.freeze()), so the caller must not keep mutating them.
+    """
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, ActivityCube):
+        value.freeze()
+    return value
+
+
+def _thaw(value):
+    """Plain-container copy of a frozen value: mappingproxies become dicts, tuples lists"""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class AnalysisResult:
+    """Immutable outcome of FetalMovementAnalyzer.analyze()
+    
+    Holds the time-sorted movement records and the stats, frozen all the
+    way down: records and nested dicts are read-only mappings, lists become
+    tuples, NumPy arrays are flagged non-writeable and the activity cube
+    rejects new detections. One result can therefore be handed to chart
+    builders on many threads (or pickled to worker processes) at once.
+    Stats are also readable as attributes, e.g. result.max_interval.
+    """
+    __slots__ = ('movements', 'stats')
+    
+    def __init__(self, movements, stats):
+        object.__setattr__(self, 'movements', _freeze(tuple(movements)))
+        object.__setattr__(self, 'stats', _freeze(stats))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"AnalysisResult is immutable (cannot set {name!r})")
+    
+    def __delattr__(self, name):
+        raise AttributeError(f"AnalysisResult is immutable (cannot delete {name!r})")
+    
+    def __getattr__(self, name):
+        try:
+            return object.__getattribute__(self, 'stats')[name]
+        except KeyError:
+            raise AttributeError(name) from None
+    
+    def __reduce__(self):
+        return AnalysisResult, (_thaw(self.movements), _thaw(self.stats))
+    
+    def to_dict(self):
+        """Stats as plain, mutable dicts and lists (e.g. for json.dumps)
+        
+        Every tuple becomes a list. NumPy arrays and the activity cube are
+        shared with the result and stay read-only.
+        """
+        return _thaw(self.stats)
+
 
 class FetalMovementAnalyzer:
-    def __init__(self):
-        self.movements = []
-        self.stats = {}
+    def __init__(self, cube_bin_minutes=60, episode_gap_minutes=EPISODE_GAP_MINUTES, verbose=True, rules=None,
+                 baseline=None):
+        self.result = None
+        self.rules = rules or DEFAULT_RULES
+        self.baseline = baseline
+        self.verbose = verbose
+        self.cube_bin_minutes = cube_bin_minutes
+        self.episode_gap_minutes = episode_gap_minutes
         
     def parse_time(self, time_str):
-        """Parse various time formats into datetime objects"""
+        """Parse various time formats into datetime objects
+        
+        Raises TimeParseError (a ValueError) whose category tells why the
+        token was rejected.
+        """
         time_str = time_str.strip().replace('*', '')
         
         # Handle 12-hour format (4pm, 5:30am, etc.)
@@ -22,13 +1243,7 @@ class FetalMovementAnalyzer:
             clean_time = time_str.lower().replace('pm', '').replace('am', '').strip()
             is_pm = 'pm' in time_str.lower()
             
-            if ':' in clean_time:
-                hours, minutes = clean_time.split(':')
-            else:
-                hours, minutes = clean_time, '00'
-                
-            hour = int(hours)
-            minute = int(minutes)
+            hour, minute = _clock_fields(clean_time)
             
             # Convert to 24-hour format
             if is_pm and hour != 12:
@@ -38,114 +1253,366 @@ class FetalMovementAnalyzer:
                 
         # Handle 24-hour format (16:30, 23:45, etc.)
         else:
-            if ':' in time_str:
-                hours, minutes = time_str.split(':')
-            else:
-                hours, minutes = time_str, '00'
-            hour = int(hours)
-            minute = int(minutes)
+            hour, minute = _clock_fields(time_str)
+        
+        if not (0 <= hour <= 23 and 0 <= minute <= 59):
+            raise TimeParseError('out_of_range', f"{hour}:{minute:02d} is not a valid time of day")
             
         return datetime(2024, 1, 1, hour, minute)
     
-    def analyze_movements(self, raw_data):
-        """Analyze movement detection data and calculate comprehensive statistics"""
-        print("🔍 Analyzing fetal movement detections...")
+    def _make_movement(self, movement_id, original, parsed_time, day):
+        """Build the per-detection record used by all analysis and charts"""
+        return {
+            'id': movement_id,
+            'original': original,
+            'day': day,
+            'datetime': parsed_time,
+            'hour': parsed_time.hour,
+            'minute': parsed_time.minute,
+            'time_str': f"{parsed_time.hour:02d}:{parsed_time.minute:02d}",
+            'hour_decimal': parsed_time.hour + parsed_time.minute/60
+        }
+    
+    @property
+    def movements(self):
+        """Movements of the last analyze_movements()/analyze_detections() call"""
+        return self.result.movements if self.result else ()
+    
+    @property
+    def stats(self):
+        """Stats of the last analyze_movements()/analyze_detections() call"""
+        return self.result.stats if self.result else MappingProxyType({})
+    
+    def analyze(self, data, stages=ANALYSIS_STAGES):
+        """Analyze detections and return an immutable AnalysisResult
+        
+        data is either the comma-separated clock-time string or an iterable
+        of datetime detections. The analyzer itself is not modified, so one
+        shared instance can serve concurrent requests; pass the result to
+        the chart builders, render_sections() or create_dashboard().
+        """
+        if self.verbose:
+            print("🔍 Analyzing fetal movement detections...")
+        if isinstance(data, str):
+            movements, parse_errors = self._parse_movements(data)
+        else:
+            movements, parse_errors = self._detection_movements(data), ParseErrorReport(verbose=self.verbose)
+        return self._analyze_parsed(movements, parse_errors, stages)
+    
+    def analyze_movements(self, raw_data, stages=ANALYSIS_STAGES):
+        """Analyze movement detection data and calculate comprehensive statistics
+        
+        Convenience for single-threaded scripts: returns the stats as plain
+        dicts (result.to_dict()) and keeps the frozen result as self.result
+        (read back through self.stats and self.movements).
+        """
+        self.result = self.analyze(str(raw_data), stages)
+        return self.result.to_dict()
+    
+    def analyze_detections(self, timestamps, stages=ANALYSIS_STAGES):
+        """Analyze detections given as datetime objects (no string parsing)
+        
+        Unlike clock-time strings, full datetimes carry their date, so days
+        are counted from the first detection's date and intervals spanning
+        midnight are exact. Like analyze_movements(), keeps self.result.
+        """
+        self.result = self.analyze(list(timestamps), stages)
+        return self.result.to_dict()
+    
+    def analyze_streams(self, streams, tolerance_seconds=MERGE_TOLERANCE_SECONDS, stages=ANALYSIS_STAGES):
+        """Merge per-source detection streams and return an AnalysisResult
+        
+        streams maps source name -> time-ordered datetimes. The merged
+        stream is consumed in a single pass (see DetectionStreamMerger) and
+        is already in time order, so it is not sorted again. Each movement keeps its 'sources', which
+        also appear in its original text, and stats gain source_counts and
+        collapsed_duplicates.
+        """
+        if self.verbose:
+            print(f"🔀 Merging detections from {len(streams)} sources...")
+        merger = DetectionStreamMerger(tolerance_seconds)
+        movements = []
+        first_date = None
+        for i, (timestamp, sources) in enumerate(merger.merge(streams)):
+            first_date = first_date or timestamp.date()
+            movement = self._make_movement(i + 1, f"{timestamp:%H:%M:%S} ({'+'.join(sources)})", timestamp,
+                                           (timestamp.date() - first_date).days)
+            movement['sources'] = sources
+            movements.append(movement)
         
+        return self._analyze_parsed(movements, ParseErrorReport(verbose=self.verbose), stages, {
+            'source_counts': merger.source_counts,
+            'collapsed_duplicates': merger.collapsed_duplicates
+        }, presorted=True)
+    
+    def _parse_movements(self, raw_data):
+        """Parse a clock-time string into movement records and a ParseErrorReport"""
         # Parse movement detection times
         times = [t.strip() for t in raw_data.split(',') if t.strip()]
-        self.movements = []
+        movements = []
+        
+        # Input is recorded in chronological order, so a clock time earlier
+        # than the previous one means the log has rolled over to a new day
+        day = 0
+        previous_time = None
+        parse_errors = ParseErrorReport(verbose=self.verbose)
         
         for i, time_str in enumerate(times):
             try:
                 parsed_time = self.parse_time(time_str)
-                self.movements.append({
-                    'id': i + 1,
-                    'original': time_str,
-                    'datetime': parsed_time,
-                    'hour': parsed_time.hour,
-                    'minute': parsed_time.minute,
-                    'time_str': f"{parsed_time.hour:02d}:{parsed_time.minute:02d}",
-                    'hour_decimal': parsed_time.hour + parsed_time.minute/60
-                })
-            except Exception as e:
-                print(f"⚠️ Warning: Could not parse time '{time_str}': {e}")
+            except ValueError as e:
+                parse_errors.add(i + 1, time_str, e)
+                continue
+            if previous_time is not None and parsed_time < previous_time:
+                day += 1
+            previous_time = parsed_time
+            movements.append(self._make_movement(i + 1, time_str, parsed_time, day))
         
+        parse_errors.log_summary()
+        return movements, parse_errors
+    
+    def _detection_movements(self, timestamps):
+        """Build movement records from datetimes, counting days from the first date"""
+        timestamps = list(timestamps)
+        first_date = min(timestamps).date() if timestamps else None
+        return [
+            self._make_movement(i + 1, timestamp.strftime('%H:%M:%S'), timestamp, (timestamp.date() - first_date).days)
+            for i, timestamp in enumerate(timestamps)
+        ]
+    
+    def _analyze_parsed(self, movements, parse_errors, stages=ANALYSIS_STAGES, extra_stats=None, presorted=False):
+        """Calculate comprehensive statistics over parsed movements
+        
+        stages selects which ANALYSIS_STAGES to compute; the keys a skipped
+        stage would add are simply absent from the result's stats.
+        extra_stats (e.g. source attribution) are added as given.
+        presorted skips the time sort for movements already in time order.
+        """
         # Sort by time
-        self.movements.sort(key=lambda x: x['datetime'])
+        if not presorted:
+            movements = sorted(movements, key=lambda x: x['datetime'])
+        
+        stats = {
+            'total_detections': len(movements),
+            'rejected_tokens': parse_errors.total_rejected,
+            'parse_errors': parse_errors.to_dict()
+        }
+        if 'intervals' in stages:
+            stats.update(self._interval_stats(movements))
+        if 'histograms' in stages:
+            stats.update(self._histogram_stats(movements))
+        if 'cube' in stages:
+            stats.update(self._cube_stats(movements))
+        if 'episodes' in stages:
+            stats.update(self._episode_stats(movements))
+        if 'trends' in stages:
+            stats.update(self._trend_stats(movements))
+        stats.update(extra_stats or {})
         
+        return AnalysisResult(movements, stats)
+    
+    def _interval_stats(self, movements):
+        """Intervals between consecutive detections, their status counts and compliance"""
         # Calculate intervals between detections
-        intervals = []
-        for i in range(1, len(self.movements)):
-            interval_minutes = (self.movements[i]['datetime'] - self.movements[i-1]['datetime']).total_seconds() / 60
-            # Handle day rollover
-            if interval_minutes < 0:
-                interval_minutes += 24 * 60
-            
-            status = 'concern' if interval_minutes > 120 else 'monitor' if interval_minutes > 60 else 'normal'
-            intervals.append({
+        detection_times = np.array([m['datetime'] for m in movements], dtype='datetime64[us]')
+        # Handle day rollover
+        interval_minutes = rollover_intervals(detection_times.view(np.int64))
+        statuses = self.rules.classify_intervals(interval_minutes).tolist()
+        rounded = np.round(interval_minutes).astype(np.int64).tolist()
+        
+        intervals = [
+            {
                 'id': i,
-                'from_time': self.movements[i-1]['time_str'],
-                'to_time': self.movements[i]['time_str'],
-                'interval': round(interval_minutes),
-                'status': status,
-                'from_original': self.movements[i-1]['original'],
-                'to_original': self.movements[i]['original']
-            })
-        
-        # Calculate hourly distribution of detections
-        hourly_counts = {hour: 0 for hour in range(24)}
-        for movement in self.movements:
-            hourly_counts[movement['hour']] += 1
-            
-        # Calculate comprehensive statistics
-        total_detections = len(self.movements)
-        avg_interval = np.mean([i['interval'] for i in intervals]) if intervals else 0
-        max_interval = max([i['interval'] for i in intervals]) if intervals else 0
-        min_interval = min([i['interval'] for i in intervals]) if intervals else 0
-        concern_intervals = len([i for i in intervals if i['status'] == 'concern'])
-        monitor_intervals = len([i for i in intervals if i['status'] == 'monitor'])
-        normal_intervals = len([i for i in intervals if i['status'] == 'normal'])
-        active_hours = len([count for count in hourly_counts.values() if count > 0])
+                'from_time': movements[i-1]['time_str'],
+                'to_time': movements[i]['time_str'],
+                'interval': rounded[i-1],
+                'status': statuses[i-1],
+                'from_original': movements[i-1]['original'],
+                'to_original': movements[i]['original']
+            }
+            for i in range(1, len(movements))
+        ]
         
-        # Determine compliance based on medical guidelines
-        if concern_intervals == 0 and max_interval <= 120:
-            compliance = 'Excellent'
-        elif concern_intervals == 0:
-            compliance = 'Good'
-        elif concern_intervals <= 2:
-            compliance = 'Monitor'
-        else:
-            compliance = 'Attention Needed'
+        avg_interval = np.mean(rounded) if intervals else 0.0
+        max_interval = max(rounded) if intervals else 0
+        min_interval = min(rounded) if intervals else 0
+        normal_intervals, monitor_intervals, concern_intervals = np.bincount(
+            self.rules.interval_codes(interval_minutes), minlength=3).tolist()
         
-        # Calculate movement patterns
-        morning_movements = len([m for m in self.movements if 6 <= m['hour'] < 12])
-        afternoon_movements = len([m for m in self.movements if 12 <= m['hour'] < 18])
-        evening_movements = len([m for m in self.movements if 18 <= m['hour'] < 24])
-        night_movements = len([m for m in self.movements if 0 <= m['hour'] < 6])
-        
-        self.stats = {
-            'total_detections': total_detections,
-            'avg_interval': round(avg_interval, 1),
+        # Determine compliance based on the configured medical guidelines
+        compliance = str(self.rules.compliance(concern_intervals, max_interval))
+        
+        return {
+            'avg_interval': round(float(avg_interval), 1),
             'max_interval': max_interval,
             'min_interval': min_interval,
             'concern_intervals': concern_intervals,
             'monitor_intervals': monitor_intervals,
             'normal_intervals': normal_intervals,
-            'active_hours': active_hours,
             'compliance': compliance,
             'intervals': intervals,
+            'detection_times': detection_times,
+            'interval_minutes': interval_minutes
+        }
+    
+    def _histogram_stats(self, movements):
+        """Per-minute cumulative counts, histograms and time-of-day pattern counts"""
+        # Cumulative per-minute counts back every histogram resolution
+        minute_cumsum = build_minute_cumsum([m['hour'] * 60 + m['minute'] for m in movements])
+        activity_histograms = {
+            width: histogram_from_cumsum(minute_cumsum, width)[1]
+            for width in HISTOGRAM_RESOLUTIONS
+        }
+        hourly_counts = dict(enumerate(activity_histograms[60].tolist()))
+        active_hours = len([count for count in hourly_counts.values() if count > 0])
+        
+        # Bin-edge-free view of the daily pattern and its smoothed peak
+        activity_density = circular_kde(np.diff(minute_cumsum))
+        peak_minute = int(peak_activity_minute(activity_density)) if movements else None
+        
+        # Calculate movement patterns
+        morning_movements = len([m for m in movements if 6 <= m['hour'] < 12])
+        afternoon_movements = len([m for m in movements if 12 <= m['hour'] < 18])
+        evening_movements = len([m for m in movements if 18 <= m['hour'] < 24])
+        night_movements = len([m for m in movements if 0 <= m['hour'] < 6])
+        
+        return {
+            'active_hours': active_hours,
             'hourly_counts': hourly_counts,
+            'minute_cumsum': minute_cumsum,
+            'activity_histograms': activity_histograms,
+            'activity_density': activity_density,
+            'peak_activity_time': format_minute_of_day(peak_minute) if movements else 'N/A',
+            'peak_activity_period': next(name.title() for name, start, end in DAY_PERIODS
+                                         if start <= peak_minute // 60 < end) if movements else 'N/A',
             'morning_movements': morning_movements,
             'afternoon_movements': afternoon_movements,
             'evening_movements': evening_movements,
             'night_movements': night_movements
         }
+    
+    def _cube_stats(self, movements):
+        """Day x time-bin activity cube and the personal baseline comparison"""
+        # Day x time-bin activity cube for multi-day monitoring
+        activity_cube = ActivityCube(self.cube_bin_minutes)
+        add_days(activity_cube, movements)
+            
+        # Compare the most recent day against this pregnancy's own baseline
+        baseline_comparison = self._compare_baseline(movements, activity_cube)
+        
+        # Circadian rhythm of the pooled pattern and of every day, in one batched fit
+        day_counts = activity_cube.counts
+        fits = fit_cosinor(np.vstack([day_counts.sum(axis=0), day_counts]), activity_cube.bin_minutes)
+        fits = {key: np.round(values, 2).tolist() for key, values in fits.items()}
+        acrophase_times = [format_minute_of_day(round(h * 60) % MINUTES_PER_DAY) for h in fits['acrophase_hours']]
+        daily_cosinor = [
+            {
+                'day': day,
+                'mesor': fits['mesor'][i + 1],
+                'amplitude': fits['amplitude'][i + 1],
+                'acrophase_hours': fits['acrophase_hours'][i + 1],
+                'acrophase_time': acrophase_times[i + 1],
+                'r_squared': fits['r_squared'][i + 1]
+            }
+            for i, day in enumerate(activity_cube.days)
+        ]
+        
+        return {
+            'cosinor_mesor': fits['mesor'][0],
+            'cosinor_amplitude': fits['amplitude'][0],
+            'cosinor_acrophase_hours': fits['acrophase_hours'][0],
+            'cosinor_acrophase_time': acrophase_times[0] if movements else 'N/A',
+            'cosinor_r_squared': fits['r_squared'][0],
+            'daily_cosinor': daily_cosinor,
+            'activity_cube': activity_cube,
+            'baseline': baseline_comparison,
+            'baseline_low_hours': baseline_comparison['low_hours'] if baseline_comparison else []
+        }
+    
+    def _episode_stats(self, movements):
+        """Collapse bursts of detections into movement episodes"""
+        episodes = self._compute_episodes(movements)
+        episode_gaps = [b['start_minutes'] - a['end_minutes'] for a, b in zip(episodes, episodes[1:])]
+        
+        return {
+            'episodes': episodes,
+            'episode_count': len(episodes),
+            'avg_episode_size': round(len(movements) / len(episodes), 1) if episodes else 0.0,
+            'avg_episode_gap': round(float(np.mean(episode_gaps)), 1) if episode_gaps else 0.0,
+            'max_episode_gap': round(max(episode_gaps)) if episode_gaps else 0
+        }
+    
+    def _trend_stats(self, movements):
+        """Per-day detection counts, period counts and median intervals, and where they shift"""
+        days = np.array([m['day'] for m in movements], dtype=np.int64)
+        minutes = np.array([m['hour'] * 60 + m['minute'] for m in movements], dtype=np.int64)
+        n_days = int(days.max()) + 1 if movements else 0
+        period_index = np.searchsorted([start for _, start, _ in DAY_PERIODS[1:]], minutes // 60, side='right')
+        period_counts = np.zeros((n_days, len(DAY_PERIODS)), dtype=np.int64)
+        np.add.at(period_counts, (days, period_index), 1)
+        daily_counts = period_counts.sum(axis=1)
+        
+        # Intervals in monitoring order, each credited to the day it ends on;
+        # per-day medians come from one sort by (day, interval)
+        order = np.lexsort((minutes, days))
+        intervals = np.diff((days * MINUTES_PER_DAY + minutes)[order])
+        interval_days = days[order][1:]
+        intervals = intervals[np.lexsort((intervals, interval_days))]
+        interval_counts = np.bincount(interval_days, minlength=n_days)
+        starts = np.cumsum(interval_counts) - interval_counts
+        has_intervals = interval_counts > 0
+        median_intervals = np.full(n_days, float(MINUTES_PER_DAY))
+        median_intervals[has_intervals] = (intervals[(starts + (interval_counts - 1) // 2)[has_intervals]]
+                                           + intervals[(starts + interval_counts // 2)[has_intervals]]) / 2
+        
+        # Variance-stabilized features (Anscombe for counts, log for intervals);
+        # a day without detections counts as a full day of silence
+        change_days = detect_change_points(np.column_stack((
+            2 * np.sqrt(np.column_stack((daily_counts, period_counts)) + 0.375),
+            np.log1p(median_intervals)
+        )))
+        bounds = np.concatenate(([0], change_days, [n_days])).astype(np.int64)
+        segments = [
+            {
+                'start_day': start,
+                'end_day': end - 1,
+                'mean_detections': round(float(daily_counts[start:end].mean()), 1),
+                'median_interval': round(float(np.median(median_intervals[start:end])), 1)
+            }
+            for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+        ] if n_days else []
+        change_points = [
+            {
+                'day': after['start_day'],
+                'direction': ('drop' if after['mean_detections'] < before['mean_detections'] else
+                              'rise' if after['mean_detections'] > before['mean_detections'] else 'shift'),
+                'detections_before': before['mean_detections'],
+                'detections_after': after['mean_detections']
+            }
+            for before, after in zip(segments, segments[1:])
+        ]
         
-        return self.stats
+        return {
+            'daily_activity': [
+                {
+                    'day': day,
+                    'detections': int(daily_counts[day]),
+                    **{f'{name}_movements': int(period_counts[day, i]) for i, (name, _, _) in enumerate(DAY_PERIODS)},
+                    'median_interval': float(median_intervals[day]) if has_intervals[day] else None
+                }
+                for day in range(n_days)
+            ],
+            'activity_segments': segments,
+            'change_points': change_points,
+            'activity_drop': bool(change_points) and change_points[-1]['direction'] == 'drop'
+        }
     
-    def create_24hour_timeline_chart(self):
+    def create_24hour_timeline_chart(self, result=None):
         """Create beautiful 24-hour movement timeline chart"""
-        timeline_data = pd.DataFrame(self.movements)
+        import plotly.graph_objects as go
+        
+        result = result or self.result
+        timeline_data = pd.DataFrame(list(result.movements), columns=MOVEMENT_FIELDS)
         
         fig = go.Figure()
         
@@ -171,23 +1638,16 @@ class FetalMovementAnalyzer:
                          'Original: %{customdata[1]}<br>' +
                          '<extra></extra>',
             text=timeline_data['id'],
-            customdata=[[row['time_str'], row['original']] for _, row in timeline_data.iterrows()]
+            customdata=[[m['time_str'], m['original']] for m in result.movements]
         ))
         
         # Add time periods background
-        periods = [
-            {'start': 0, 'end': 6, 'color': 'rgba(59, 130, 246, 0.1)', 'name': 'Night'},
-            {'start': 6, 'end': 12, 'color': 'rgba(16, 185, 129, 0.1)', 'name': 'Morning'},
-            {'start': 12, 'end': 18, 'color': 'rgba(245, 158, 11, 0.1)', 'name': 'Afternoon'},
-            {'start': 18, 'end': 24, 'color': 'rgba(139, 92, 246, 0.1)', 'name': 'Evening'}
-        ]
-        
-        for period in periods:
+        for name, start, end in DAY_PERIODS:
             fig.add_vrect(
-                x0=period['start'], x1=period['end'],
-                fillcolor=period['color'],
+                x0=start, x1=end,
+                fillcolor=PERIOD_BACKGROUNDS[name],
                 layer="below", line_width=0,
-                annotation_text=period['name'],
+                annotation_text=name.title(),
                 annotation_position="top"
             )
         
@@ -223,45 +1683,132 @@ class FetalMovementAnalyzer:
         
         return fig
     
-    def create_hourly_distribution_chart(self):
-        """Create beautiful hourly distribution chart"""
-        hours = list(range(24))
-        counts = [self.stats['hourly_counts'][h] for h in hours]
-        
-        # Create beautiful color gradient
-        colors = []
-        for count in counts:
-            if count == 0:
-                colors.append('#ef4444')  # Red for no activity
-            elif count <= 2:
-                colors.append('#f59e0b')  # Yellow for low activity
-            elif count <= 4:
-                colors.append('#10b981')  # Green for normal activity
-            else:
-                colors.append('#3b82f6')  # Blue for high activity
+    def _compare_baseline(self, movements, activity_cube):
+        """Judge the latest monitored day's hourly counts against self.baseline"""
+        if self.baseline is None:
+            return None
         
-        fig = go.Figure(data=[
-            go.Bar(
-                x=[f"{h:02d}:00" for h in hours],
+        latest_day = activity_cube.days[-1] if activity_cube.days else None
+        day_counts = np.zeros(24, dtype=np.int64)
+        if latest_day is not None:
+            # Counted from the movements: cube bins need not nest within hours (e.g. 90 minutes)
+            hours = [m['hour'] for m in movements if m['day'] == latest_day]
+            day_counts = np.bincount(hours, minlength=24)
+            # Hours after the last detection of that day have not been observed yet
+            through_hour = max(hours)
+        else:
+            through_hour = -1
+        
+        comparison = self.baseline.compare(day_counts, through_hour)
+        comparison['day_hourly_counts'] = day_counts.tolist()
+        return comparison
+    
+    def _compute_episodes(self, movements):
+        """Merge sorted detections within episode_gap_minutes into episodes"""
+        if not movements:
+            return []
+        
+        origin = movements[0]['datetime']
+        # Minutes on the clock of the first day, so hour_decimal-style axes still apply
+        offset = origin.hour * 60 + origin.minute + origin.second / 60
+        minutes = np.array([(m['datetime'] - origin).total_seconds() for m in movements]) / 60 + offset
+        start_index, end_index, counts = cluster_episodes(minutes, self.episode_gap_minutes)
+        minutes = minutes.tolist()
+        
+        return [
+            {
+                'id': i + 1,
+                'start_time': movements[start]['time_str'],
+                'end_time': movements[end]['time_str'],
+                'start_minutes': minutes[start],
+                'end_minutes': minutes[end],
+                'count': count,
+                'duration': round(minutes[end] - minutes[start])
+            }
+            for i, (start, end, count) in enumerate(zip(start_index.tolist(), end_index.tolist(), counts.tolist()))
+        ]
+    
+    def activity_histogram(self, bin_minutes=60, edges=None, result=None):
+        """Return (edges, counts) at any resolution from the cumulative counts"""
+        result = result or self.result
+        if edges is None and bin_minutes in result.stats['activity_histograms']:
+            return histogram_edges(bin_minutes), result.stats['activity_histograms'][bin_minutes]
+        return histogram_from_cumsum(result.stats['minute_cumsum'], bin_minutes, edges)
+    
+    def create_hourly_distribution_chart(self, result=None, resolutions=None):
+        """Create beautiful hourly distribution chart
+        
+        When several resolutions (bin widths in minutes) are given, one bar
+        trace per resolution is added and a switcher toggles between them;
+        the 60-minute view is shown first when available.
+        """
+        import plotly.graph_objects as go
+        
+        result = result or self.result
+        resolutions = list(resolutions) if resolutions else [60]
+        default = 60 if 60 in resolutions else resolutions[0]
+        
+        fig = go.Figure()
+        for width in resolutions:
+            edges, counts = self.activity_histogram(width, result=result)
+            if width >= MIN_ACTIVITY_BIN_MINUTES:
+                colors, labels = self.rules.classify_activity(counts, width)
+                colors, labels = colors.tolist(), labels.tolist()
+                status_line = 'Status: %{customdata}<br>'
+            else:
+                colors, labels, status_line = NEUTRAL_BAR_COLOR, None, ''
+            fig.add_trace(go.Bar(
+                x=[format_minute_of_day(m) for m in edges[:-1]],
                 y=counts,
                 marker=dict(
+                    # Create beautiful color gradient
                     color=colors,
-                    line=dict(color='rgba(255, 255, 255, 0.8)', width=1.5),
+                    line=dict(color='rgba(255, 255, 255, 0.8)', width=1.5 if width >= 15 else 0),
                     opacity=0.9
                 ),
                 name='Movement Detections',
+                visible=width == default,
                 hovertemplate='<b>%{x}</b><br>' +
                              'Detections: %{y}<br>' +
-                             'Status: %{customdata}<br>' +
+                             status_line +
+                             '<extra></extra>',
+                customdata=labels
+            ))
+        
+        # Flag hours significantly below this pregnancy's baseline
+        low_hours = result.stats['baseline_low_hours']
+        if low_hours:
+            expected = result.stats['baseline']['expected_hourly']
+            fig.add_trace(go.Scatter(
+                x=[f"{h:02d}:00" for h in low_hours],
+                y=[result.stats['hourly_counts'][h] for h in low_hours],
+                mode='markers',
+                marker=dict(symbol='triangle-down', size=16, color='#7c3aed',
+                            line=dict(width=2, color='rgba(255, 255, 255, 0.9)')),
+                name='Below Baseline',
+                visible=default == 60,
+                hovertemplate='<b>%{x}</b><br>' +
+                             'Below personal baseline<br>' +
+                             'Expected: %{customdata} per day<br>' +
                              '<extra></extra>',
-                customdata=[
-                    'No Activity' if c == 0 else 
-                    'Low Activity' if c <= 2 else 
-                    'Normal Activity' if c <= 4 else 
-                    'High Activity' for c in counts
+                customdata=[expected[h] for h in low_hours]
+            ))
+        
+        if len(resolutions) > 1:
+            fig.update_layout(updatemenus=[dict(
+                type='buttons',
+                direction='right',
+                x=1, y=1.12, xanchor='right', yanchor='bottom',
+                active=resolutions.index(default),
+                buttons=[
+                    dict(
+                        label=f'{width} min',
+                        method='update',
+                        args=[{'visible': [w == width for w in resolutions] + [width == 60] * bool(low_hours)}]
+                    )
+                    for width in resolutions
                 ]
-            )
-        ])
+            )])
         
         fig.update_layout(
             title={
@@ -289,9 +1836,278 @@ class FetalMovementAnalyzer:
         
         return fig
     
-    def create_pattern_analysis_chart(self):
+    def create_activity_density_chart(self, result=None):
+        """Create 24-hour circular activity density chart with its smoothed peak"""
+        import plotly.graph_objects as go
+        
+        result = result or self.result
+        stats = result.stats
+        # Scale the density to detections per hour so it reads like the hourly bars
+        rate = stats['activity_density'] * stats['total_detections'] * 60
+        
+        fig = go.Figure()
+        
+        fig.add_trace(go.Scatter(
+            x=np.arange(MINUTES_PER_DAY) / 60,
+            y=rate,
+            mode='lines',
+            line=dict(color='#7c3aed', width=3, shape='spline'),
+            fill='tozeroy',
+            fillcolor='rgba(124, 58, 237, 0.15)',
+            name='Smoothed Activity',
+            hovertemplate='<b>%{x:.2f}h</b><br>' +
+                         'Smoothed rate: %{y:.2f} detections/hour<br>' +
+                         '<extra></extra>'
+        ))
+        
+        if stats['total_detections']:
+            fig.add_vline(
+                x=int(stats['peak_activity_time'][:2]) + int(stats['peak_activity_time'][3:]) / 60,
+                line_dash="dash", line_color="#7c3aed", line_width=2,
+                annotation_text=f"Peak {stats['peak_activity_time']}",
+                annotation_position="top right"
+            )
+        
+        fig.update_layout(
+            title={
+                'text': f'🌙 Circular Activity Density (±{KDE_BANDWIDTH_MINUTES} min kernel)',
+                'font': {'size': 24, 'color': '#5b21b6', 'family': 'Arial Black'},
+                'x': 0.5
+            },
+            xaxis=dict(
+                title='Hour of Day',
+                tickmode='linear',
+                tick0=0,
+                dtick=2,
+                showgrid=True,
+                gridcolor='rgba(124, 58, 237, 0.2)',
+                range=[0, 24]
+            ),
+            yaxis=dict(
+                title='Detections per Hour (smoothed)',
+                showgrid=True,
+                gridcolor='rgba(124, 58, 237, 0.2)',
+                rangemode='tozero'
+            ),
+            plot_bgcolor='rgba(245, 243, 255, 0.8)',
+            paper_bgcolor='rgba(124, 58, 237, 0.05)',
+            font=dict(family="Arial, sans-serif", size=14, color="#374151"),
+            showlegend=False,
+            height=400,
+            margin=dict(l=60, r=60, t=80, b=60)
+        )
+        
+        return fig
+    
+    def create_activity_heatmap_chart(self, result=None):
+        """Create day x hour activity heatmap from the materialized cube"""
+        import plotly.graph_objects as go
+        
+        result = result or self.result
+        cube = result.stats['activity_cube']
+        
+        fig = go.Figure(data=[
+            go.Heatmap(
+                z=cube.counts,
+                x=cube.bin_labels(),
+                y=[f"Day {day + 1}" for day in cube.days],
+                colorscale=[[0, '#fef2f2'], [0.25, '#fde68a'], [0.6, '#34d399'], [1, '#2563eb']],
+                xgap=2,
+                ygap=2,
+                colorbar=dict(title='Detections'),
+                hovertemplate='<b>%{y}, %{x}</b><br>' +
+                             'Detections: %{z}<br>' +
+                             '<extra></extra>'
+            )
+        ])
+        
+        fig.update_layout(
+            title={
+                'text': '🗓️ Daily Activity Heatmap',
+                'font': {'size': 24, 'color': '#0f766e', 'family': 'Arial Black'},
+                'x': 0.5
+            },
+            xaxis=dict(
+                title='Time of Day',
+                tickangle=45
+            ),
+            yaxis=dict(
+                title='Monitoring Day',
+                autorange='reversed'
+            ),
+            plot_bgcolor='rgba(240, 253, 250, 0.8)',
+            paper_bgcolor='rgba(20, 184, 166, 0.05)',
+            font=dict(family="Arial, sans-serif", size=14, color="#374151"),
+            height=max(300, 120 + 40 * len(cube.days)),
+            margin=dict(l=80, r=60, t=80, b=100)
+        )
+        
+        return fig
+    
+    def create_activity_trend_chart(self, result=None):
+        """Create multi-day activity trend chart with detected change points"""
+        import plotly.graph_objects as go
+        
+        result = result or self.result
+        stats = result.stats
+        daily = stats['daily_activity']
+        days = [d['day'] + 1 for d in daily]
+        
+        fig = go.Figure()
+        
+        fig.add_trace(go.Bar(
+            x=days,
+            y=[d['detections'] for d in daily],
+            marker=dict(color='#14b8a6', line=dict(color='rgba(255, 255, 255, 0.8)', width=1)),
+            name='Daily Detections',
+            customdata=[[d['morning_movements'], d['afternoon_movements'], d['evening_movements'], d['night_movements']]
+                        for d in daily],
+            hovertemplate='<b>Day %{x}</b><br>' +
+                         'Detections: %{y}<br>' +
+                         'Morning %{customdata[0]}, afternoon %{customdata[1]}, ' +
+                         'evening %{customdata[2]}, night %{customdata[3]}<br>' +
+                         '<extra></extra>'
+        ))
+        
+        # Level of each segment between change points
+        segment_x, segment_y = [], []
+        for segment in stats['activity_segments']:
+            segment_x += [segment['start_day'] + 0.5, segment['end_day'] + 1.5, None]
+            segment_y += [segment['mean_detections'], segment['mean_detections'], None]
+        fig.add_trace(go.Scatter(
+            x=segment_x,
+            y=segment_y,
+            mode='lines',
+            line=dict(color='#0f766e', width=3, dash='dash'),
+            name='Segment Level',
+            hovertemplate='Segment mean: %{y} detections/day<extra></extra>'
+        ))
+        
+        fig.add_trace(go.Scatter(
+            x=days,
+            y=[d['median_interval'] for d in daily],
+            mode='lines+markers',
+            line=dict(color='#6366f1', width=2),
+            marker=dict(size=6),
+            name='Median Interval',
+            yaxis='y2',
+            connectgaps=False,
+            hovertemplate='<b>Day %{x}</b><br>Median interval: %{y} min<extra></extra>'
+        ))
+        
+        for change in stats['change_points']:
+            color = STATUS_COLORS['concern'] if change['direction'] == 'drop' else STATUS_COLORS['normal']
+            fig.add_vline(
+                x=change['day'] + 0.5,
+                line=dict(color=color, width=2, dash='dot'),
+                annotation_text=f"{'▼' if change['direction'] == 'drop' else '▲'} Day {change['day'] + 1}: "
+                                f"{change['detections_before']} → {change['detections_after']}/day",
+                annotation_font=dict(color=color, size=12)
+            )
+        
+        fig.update_layout(
+            title={
+                'text': '📉 Multi-Day Activity Trend',
+                'font': {'size': 24, 'color': '#0f766e', 'family': 'Arial Black'},
+                'x': 0.5
+            },
+            xaxis=dict(
+                title='Monitoring Day',
+                tickmode='linear',
+                tick0=1,
+                dtick=max(1, len(days) // 15),
+                showgrid=False
+            ),
+            yaxis=dict(
+                title='Detections per Day',
+                showgrid=True,
+                gridcolor='rgba(20, 184, 166, 0.2)',
+                rangemode='tozero'
+            ),
+            yaxis2=dict(
+                title='Median Interval (minutes)',
+                overlaying='y',
+                side='right',
+                showgrid=False,
+                rangemode='tozero'
+            ),
+            legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+            plot_bgcolor='rgba(240, 253, 250, 0.8)',
+            paper_bgcolor='rgba(20, 184, 166, 0.05)',
+            font=dict(family="Arial, sans-serif", size=14, color="#374151"),
+            height=450,
+            margin=dict(l=60, r=60, t=100, b=60)
+        )
+        
+        return fig
+    
+    def create_episodes_chart(self, result=None):
+        """Create movement episodes chart (one point per burst of detections)"""
+        import plotly.graph_objects as go
+        
+        result = result or self.result
+        episodes = result.stats['episodes']
+        
+        fig = go.Figure()
+        
+        fig.add_trace(go.Scatter(
+            x=[(e['start_minutes'] % MINUTES_PER_DAY) / 60 for e in episodes],
+            y=[e['count'] for e in episodes],
+            mode='markers',
+            marker=dict(
+                size=[10 + min(e['duration'], 120) / 4 for e in episodes],
+                color=[e['count'] for e in episodes],
+                colorscale='Teal',
+                opacity=0.85,
+                line=dict(width=2, color='rgba(255, 255, 255, 0.8)')
+            ),
+            name='Movement Episodes',
+            hovertemplate='<b>Episode #%{text}</b><br>' +
+                         'From: %{customdata[0]}<br>' +
+                         'To: %{customdata[1]}<br>' +
+                         'Detections: %{y}<br>' +
+                         'Duration: %{customdata[2]} min<br>' +
+                         '<extra></extra>',
+            text=[e['id'] for e in episodes],
+            customdata=[[e['start_time'], e['end_time'], e['duration']] for e in episodes]
+        ))
+        
+        fig.update_layout(
+            title={
+                'text': f'🌊 Movement Episodes (gap ≤ {self.episode_gap_minutes} min)',
+                'font': {'size': 24, 'color': '#0e7490', 'family': 'Arial Black'},
+                'x': 0.5
+            },
+            xaxis=dict(
+                title='Episode Start (Hour of Day)',
+                tickmode='linear',
+                tick0=0,
+                dtick=2,
+                showgrid=True,
+                gridcolor='rgba(14, 116, 144, 0.2)',
+                range=[-0.5, 24]
+            ),
+            yaxis=dict(
+                title='Detections in Episode',
+                showgrid=True,
+                gridcolor='rgba(14, 116, 144, 0.2)',
+                rangemode='tozero'
+            ),
+            plot_bgcolor='rgba(236, 254, 255, 0.8)',
+            paper_bgcolor='rgba(14, 116, 144, 0.05)',
+            font=dict(family="Arial, sans-serif", size=14, color="#374151"),
+            height=400,
+            margin=dict(l=60, r=60, t=80, b=60)
+        )
+        
+        return fig
+    
+    def create_pattern_analysis_chart(self, result=None):
         """Create movement pattern analysis scatter plot"""
-        timeline_data = pd.DataFrame(self.movements)
+        import plotly.graph_objects as go
+        
+        result = result or self.result
+        timeline_data = pd.DataFrame(list(result.movements), columns=MOVEMENT_FIELDS)
         
         fig = go.Figure()
         
@@ -321,7 +2137,23 @@ class FetalMovementAnalyzer:
                          'Hour: %{x}, Minute: %{y}<br>' +
                          '<extra></extra>',
             text=timeline_data['id'],
-            customdata=[[row['time_str'], row['original']] for _, row in timeline_data.iterrows()]
+            customdata=[[m['time_str'], m['original']] for m in result.movements]
+        ))
+        
+        # Fitted 24-hour rhythm on a secondary axis (detections per hour)
+        stats = result.stats
+        hours = np.linspace(-0.5, 23.5, 97)
+        fig.add_trace(go.Scatter(
+            x=hours,
+            y=cosinor_curve(stats['cosinor_mesor'], stats['cosinor_amplitude'], stats['cosinor_acrophase_hours'], hours),
+            mode='lines',
+            line=dict(color='#be185d', width=3, dash='dot'),
+            name='Cosinor Rhythm',
+            yaxis='y2',
+            hovertemplate=f"<b>Cosinor fit</b><br>" +
+                         f"MESOR: {stats['cosinor_mesor']}/h, amplitude: {stats['cosinor_amplitude']}/h<br>" +
+                         f"Acrophase: {stats['cosinor_acrophase_time']} (R² {stats['cosinor_r_squared']})<br>" +
+                         '%{x:.1f}h: %{y:.2f} detections/hour<extra></extra>'
         ))
         
         fig.update_layout(
@@ -345,6 +2177,14 @@ class FetalMovementAnalyzer:
                 gridcolor='rgba(244, 63, 94, 0.2)',
                 range=[0, 60]
             ),
+            yaxis2=dict(
+                title='Cosinor Fit (detections/hour)',
+                overlaying='y',
+                side='right',
+                showgrid=False,
+                rangemode='tozero'
+            ),
+            legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
             plot_bgcolor='rgba(253, 242, 248, 0.8)',
             paper_bgcolor='rgba(244, 63, 94, 0.05)',
             font=dict(family="Arial, sans-serif", size=14, color="#374151"),
@@ -354,9 +2194,12 @@ class FetalMovementAnalyzer:
         
         return fig
     
-    def create_intervals_safety_chart(self):
+    def create_intervals_safety_chart(self, result=None):
         """Create intervals and safety analysis chart"""
-        if not self.stats['intervals']:
+        import plotly.graph_objects as go
+        
+        result = result or self.result
+        if not result.stats['intervals']:
             fig = go.Figure()
             fig.add_annotation(
                 text="No interval data available - need at least 2 detections",
@@ -365,11 +2208,10 @@ class FetalMovementAnalyzer:
             )
             return fig
         
-        interval_data = pd.DataFrame(self.stats['intervals'])
+        interval_data = pd.DataFrame(result.stats['intervals'])
         
         # Create color mapping
-        color_map = {'normal': '#10b981', 'monitor': '#f59e0b', 'concern': '#ef4444'}
-        colors = [color_map[status] for status in interval_data['status']]
+        colors = [STATUS_COLORS[status] for status in interval_data['status']]
         
         fig = go.Figure()
         
@@ -391,18 +2233,17 @@ class FetalMovementAnalyzer:
                          'To: %{customdata[1]} (%{customdata[3]})<br>' +
                          'Status: %{customdata[4]}<br>' +
                          '<extra></extra>',
-            customdata=[[row['from_time'], row['to_time'], row['from_original'], 
-                        row['to_original'], row['status'].title()] 
-                       for _, row in interval_data.iterrows()]
+            customdata=[[i['from_time'], i['to_time'], i['from_original'], i['to_original'], i['status'].title()]
+                        for i in result.stats['intervals']]
         ))
         
         # Add safety threshold lines
-        fig.add_hline(y=120, line_dash="dash", line_color="red", line_width=3,
-                     annotation_text="⚠️ ALERT THRESHOLD (120 min)", 
+        fig.add_hline(y=self.rules.concern_minutes, line_dash="dash", line_color="red", line_width=3,
+                     annotation_text=f"⚠️ ALERT THRESHOLD ({self.rules.concern_minutes} min)", 
                      annotation_position="top right")
         
-        fig.add_hline(y=60, line_dash="dot", line_color="orange", line_width=2,
-                     annotation_text="⚡ MONITOR THRESHOLD (60 min)", 
+        fig.add_hline(y=self.rules.monitor_minutes, line_dash="dot", line_color="orange", line_width=2,
+                     annotation_text=f"⚡ MONITOR THRESHOLD ({self.rules.monitor_minutes} min)", 
                      annotation_position="bottom right")
         
         fig.update_layout(
@@ -428,63 +2269,490 @@ class FetalMovementAnalyzer:
             margin=dict(l=60, r=60, t=80, b=60)
         )
         
-        return fig
-    
-    def create_intervals_table_html(self):
-        """Create beautiful HTML table for movement intervals"""
-        if not self.stats['intervals']:
-            return "<p>No interval data available - need at least 2 movement detections.</p>"
+        return fig
+    
+    def create_intervals_table_html(self, result=None):
+        """Create beautiful HTML table for movement intervals"""
+        result = result or self.result
+        if not result.stats['intervals']:
+            return "<p>No interval data available - need at least 2 movement detections.</p>"
+        
+        table_html = """
+        <div class="table-container">
+            <h3 class="table-title">📋 Movement Intervals Analysis</h3>
+            <div class="table-wrapper">
+                <table class="intervals-table">
+                    <thead>
+                        <tr>
+                            <th>From</th>
+                            <th>To</th>
+                            <th>Interval (min)</th>
+                            <th>Status</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+        """
+        
+        for interval in result.stats['intervals']:
+            status_class = interval['status']
+            status_text = interval['status'].title()
+            status_icon = STATUS_ICONS[status_class]
+            
+            table_html += f"""
+                        <tr class="interval-row {status_class}">
+                            <td><span class="time-badge">{html.escape(interval['from_time'])}</span><br><small>{html.escape(interval['from_original'])}</small></td>
+                            <td><span class="time-badge">{html.escape(interval['to_time'])}</span><br><small>{html.escape(interval['to_original'])}</small></td>
+                            <td><span class="interval-value">{interval['interval']}</span></td>
+                            <td><span class="status-badge {status_class}">{status_icon} {status_text}</span></td>
+                        </tr>
+            """
+        
+        table_html += """
+                    </tbody>
+                </table>
+            </div>
+        </div>
+        """
+        
+        return table_html
+    
+    def create_24hour_timeline_svg(self, result=None):
+        """Create the 24-hour timeline as inline SVG (no Plotly, no JavaScript)"""
+        result = result or self.result
+        left, right, top, bottom = SVG_MARGIN
+        x = _svg_scale(-0.5, 23.5, left, SVG_WIDTH - right)
+        y = (top + SVG_HEIGHT - bottom) / 2
+        
+        body = []
+        for name, start, end in DAY_PERIODS:
+            x0, x1 = x([max(start, -0.5), min(end, 23.5)])
+            body.append(f'<rect x="{x0:.0f}" y="{top}" width="{x1 - x0:.0f}" height="{SVG_HEIGHT - bottom - top}" '
+                        f'fill="{PERIOD_BACKGROUNDS[name]}"/>'
+                        f'<text x="{(x0 + x1) / 2:.0f}" y="{top + 18}" text-anchor="middle">{name.title()}</text>')
+        
+        xs = x([m['hour_decimal'] for m in result.movements]).tolist()
+        if xs:
+            # Every point shares one y, so the connecting line is a single segment
+            body.append(f'<line x1="{round(min(xs))}" y1="{y:.0f}" x2="{round(max(xs))}" y2="{y:.0f}" '
+                        f'stroke="rgba(139, 92, 246, 0.8)" stroke-width="4"/>')
+        
+        # Marker hues cycle every 36 detections; only the last marker drawn
+        # at each pixel is visible, so keep that one and emit one path per hue
+        latest = {round(px): (240 + i*10) % 360 for i, px in enumerate(xs)}
+        hues = {}
+        for px, hue in latest.items():
+            hues.setdefault(hue, []).append((px, y))
+        body.append('<g stroke="rgba(255, 255, 255, 0.8)" stroke-width="2">')
+        body.extend(_svg_markers(points, f'hsl({hue}, 70%, 60%)') for hue, points in hues.items())
+        body.append('</g>')
+        
+        body.append('<g fill="transparent">')
+        if len(xs) <= SVG_TOOLTIP_LIMIT:
+            body.extend(
+                f'<circle cx="{px:.0f}" cy="{y:.0f}" r="6">'
+                f'<title>#{m["id"]} {m["time_str"]} ({html.escape(m["original"])})</title></circle>'
+                for px, m in zip(xs, result.movements)
+            )
+        else:
+            # Large logs get one tooltip per hour instead of per detection
+            counts = np.bincount([m['hour'] for m in result.movements], minlength=24)
+            x0s = x(np.arange(24) - 0.5).tolist()
+            body.extend(
+                f'<rect x="{max(x0, left):.0f}" y="{top}" width="{min(x0 + x(1) - x(0), SVG_WIDTH - right) - max(x0, left):.0f}" '
+                f'height="{SVG_HEIGHT - bottom - top}"><title>{h:02d}:00-{h:02d}:59 - {count} detections</title></rect>'
+                for h, (x0, count) in enumerate(zip(x0s, counts.tolist())) if count
+            )
+        body.append('</g>')
+        
+        x_ticks = [(px, f'{h:02d}:00') for h, px in zip(range(0, 24, 2), x(range(0, 24, 2)).tolist())]
+        return _svg_chart('🕐 24-Hour Movement Detection Timeline', '#6366f1', 'rgba(248, 250, 252, 0.8)',
+                          'rgba(99, 102, 241, 0.2)', x_ticks, [], 'Hour of Day', 'Movement Detections', body)
+    
+    def create_hourly_distribution_svg(self, result=None):
+        """Create the hourly distribution as inline SVG bars colored by activity level"""
+        result = result or self.result
+        left, right, top, bottom = SVG_MARGIN
+        edges, counts = self.activity_histogram(60, result=result)
+        colors, labels = self.rules.classify_activity(counts, 60)
+        y_values = _nice_ticks(counts.max(initial=0))
+        x = _svg_scale(0, 24, left, SVG_WIDTH - right)
+        y = _svg_scale(0, y_values[-1], SVG_HEIGHT - bottom, top)
+        
+        slot = x(1) - x(0)
+        bar_x = x(np.arange(24)) + slot * 0.1
+        bar_y = y(counts)
+        body = [
+            f'<rect x="{bx:.0f}" y="{by:.0f}" width="{slot * 0.8:.0f}" height="{SVG_HEIGHT - bottom - by:.0f}" '
+            f'fill="{color}" fill-opacity="0.9" stroke="rgba(255, 255, 255, 0.8)" stroke-width="1.5">'
+            f'<title>{h:02d}:00 - {count} detections ({label})</title></rect>'
+            for h, (bx, by, count, color, label) in enumerate(zip(bar_x.tolist(), bar_y.tolist(), counts.tolist(),
+                                                                  colors.tolist(), labels.tolist()))
+        ]
+        
+        # Flag hours significantly below this pregnancy's baseline
+        for h in result.stats['baseline_low_hours']:
+            body.append(f'<text x="{bar_x[h] + slot * 0.4:.0f}" y="{bar_y[h] - 6:.0f}" text-anchor="middle" '
+                        f'font-size="16" fill="#7c3aed"><title>Below personal baseline</title>▼</text>')
+        
+        x_ticks = [(px + slot / 2, f'{h:02d}:00') for h, px in zip(range(0, 24, 2), x(range(0, 24, 2)).tolist())]
+        y_ticks = [(py, f'{value:g}') for value, py in zip(y_values.tolist(), y(y_values).tolist())]
+        return _svg_chart('📊 Hourly Movement Detection Distribution', '#047857', 'rgba(240, 253, 244, 0.8)',
+                          'rgba(16, 185, 129, 0.2)', x_ticks, y_ticks, 'Hour of Day', 'Number of Detections', body)
+    
+    def create_intervals_safety_svg(self, result=None):
+        """Create the intervals chart with safety thresholds as inline SVG"""
+        result = result or self.result
+        left, right, top, bottom = SVG_MARGIN
+        intervals = result.stats['intervals']
+        if not intervals:
+            return _svg_chart('⏱️ Movement Intervals & Safety Analysis', '#4f46e5', 'rgba(238, 242, 255, 0.8)',
+                              'rgba(99, 102, 241, 0.2)', [], [], 'Interval Number', 'Minutes Between Detections',
+                              [f'<text x="{SVG_WIDTH / 2}" y="{SVG_HEIGHT / 2}" text-anchor="middle" font-size="16">'
+                               'No interval data available - need at least 2 detections</text>'])
+        
+        minutes = np.array([i['interval'] for i in intervals])
+        y_values = _nice_ticks(max(minutes.max(), self.rules.concern_minutes) * 1.05)
+        x = _svg_scale(0.5, len(intervals) + 0.5, left, SVG_WIDTH - right)
+        y = _svg_scale(0, y_values[-1], SVG_HEIGHT - bottom, top)
+        xs, ys = x(np.arange(1, len(intervals) + 1)).tolist(), y(minutes).tolist()
+        
+        body = [f'<polyline points="{_svg_polyline_points(xs, ys)}" fill="none" '
+                f'stroke="rgba(99, 102, 241, 0.8)" stroke-width="3"/>']
+        statuses = [i['status'] for i in intervals]
+        body.append('<g stroke="rgba(255, 255, 255, 0.8)" stroke-width="2">')
+        body.extend(
+            _svg_markers([(px, py) for px, py, s in zip(xs, ys, statuses) if s == status], color, grid=3)
+            for status, color in STATUS_COLORS.items() if status in statuses
+        )
+        body.append('</g>')
+        
+        # Large logs keep tooltips on out-of-range intervals only, thinned to the limit
+        tipped = range(len(intervals))
+        if len(intervals) > SVG_TOOLTIP_LIMIT:
+            tipped = [k for k, status in enumerate(statuses) if status != 'normal']
+            if len(tipped) > SVG_TOOLTIP_LIMIT:
+                tipped = [tipped[k] for k in np.linspace(0, len(tipped) - 1, SVG_TOOLTIP_LIMIT).astype(int).tolist()]
+        body.append('<g fill="transparent">')
+        body.extend(
+            f'<circle cx="{xs[k]:.0f}" cy="{ys[k]:.0f}" r="6"><title>#{intervals[k]["id"]} {intervals[k]["interval"]} min, '
+            f'{intervals[k]["from_time"]}-{intervals[k]["to_time"]} ({intervals[k]["status"]})</title></circle>'
+            for k in tipped
+        )
+        body.append('</g>')
+        
+        # Add safety threshold lines
+        for minutes_limit, color, dash, label in (
+            (self.rules.concern_minutes, 'red', '8 6', f'⚠️ ALERT THRESHOLD ({self.rules.concern_minutes} min)'),
+            (self.rules.monitor_minutes, 'orange', '2 4', f'⚡ MONITOR THRESHOLD ({self.rules.monitor_minutes} min)'),
+        ):
+            py = float(y(minutes_limit))
+            body.append(f'<line x1="{left}" y1="{py:.0f}" x2="{SVG_WIDTH - right}" y2="{py:.0f}" stroke="{color}" '
+                        f'stroke-width="2" stroke-dasharray="{dash}"/>'
+                        f'<text x="{SVG_WIDTH - right - 4}" y="{py - 6:.0f}" text-anchor="end" fill="{color}">{label}</text>')
+        
+        tick_ids = _nice_ticks(len(intervals))
+        tick_ids = tick_ids[(tick_ids >= 1) & (tick_ids <= len(intervals))]
+        x_ticks = [(px, f'{value:g}') for value, px in zip(tick_ids.tolist(), x(tick_ids).tolist())]
+        y_ticks = [(py, f'{value:g}') for value, py in zip(y_values.tolist(), y(y_values).tolist())]
+        return _svg_chart('⏱️ Movement Intervals & Safety Analysis', '#4f46e5', 'rgba(238, 242, 255, 0.8)',
+                          'rgba(99, 102, 241, 0.2)', x_ticks, y_ticks, 'Interval Number', 'Minutes Between Detections', body)
+    
+    def to_arrow(self, patient_id=None, result=None):
+        """Export movements, intervals, hourly counts and scalar stats as Arrow tables
+        
+        Numeric and timestamp columns wrap the analyzer's NumPy arrays
+        without copying. Scalar stats keep a stable type per key (floats are
+        always floats), so tables from many patients share one schema. With
+        patient_id, every table gets a patient_id column.
+        """
+        pa, _ = _require_pyarrow()
+        result = result or self.result
+        stats = result.stats
+        intervals = stats['intervals']
+        
+        tables = {
+            'movements': pa.table({
+                'id': pa.array([m['id'] for m in result.movements], pa.int32()),
+                'original': pa.array([m['original'] for m in result.movements], pa.string()),
+                'day': pa.array([m['day'] for m in result.movements], pa.int32()),
+                'detected_at': pa.array(stats['detection_times']),
+                'minute_of_day': pa.array([m['hour'] * 60 + m['minute'] for m in result.movements], pa.int16()),
+            }),
+            'intervals': pa.table({
+                'id': pa.array([i['id'] for i in intervals], pa.int32()),
+                'from_time': pa.array([i['from_time'] for i in intervals], pa.string()),
+                'to_time': pa.array([i['to_time'] for i in intervals], pa.string()),
+                'interval_minutes': pa.array(stats['interval_minutes']),
+                'status': pa.array([i['status'] for i in intervals], pa.string()).dictionary_encode(),
+            }),
+            'hourly': pa.table({
+                'hour': pa.array(np.arange(24, dtype=np.int8)),
+                'detections': pa.array(stats['activity_histograms'][60]),
+            }),
+            'stats': pa.table({
+                key: [value.item() if isinstance(value, np.generic) else value]
+                for key, value in stats.items()
+                if isinstance(value, (int, float, str, np.generic))
+            }),
+        }
+        
+        if patient_id is not None:
+            tables = {
+                name: table.append_column('patient_id', pa.array([str(patient_id)] * table.num_rows, pa.string()))
+                for name, table in tables.items()
+            }
+        return tables
+    
+    def export_parquet(self, directory, patient_id=None, result=None):
+        """Write the Arrow tables as <directory>/<table>.parquet files"""
+        _, pq = _require_pyarrow()
+        os.makedirs(directory, exist_ok=True)
+        paths = {}
+        for name, table in self.to_arrow(patient_id, result).items():
+            paths[name] = os.path.join(directory, f"{name}.parquet")
+            pq.write_table(table, paths[name])
+        return paths
+    
+    def render_sections(self, executor='auto', max_workers=None, typed_arrays=True, sections=None, result=None,
+                        backend='plotly'):
+        """Build and serialize dashboard sections of result, possibly concurrently
+        
+        sections is an iterable of DASHBOARD_SECTIONS names (default: all
+        the backend supports); only those figures are built. backend='svg'
+        returns inline SVG strings instead of Plotly JSON. executor:
+        'process', 'thread', None (serial) or 'auto'. 'auto' renders
+        serially: the largest section dominates the total and a process
+        pool pays for start-up and transferring the result, so pools are
+        opt-in (compare them with --benchmark on the serving hardware).
+        A process pool receives the analyzer and result once per worker
+        (pool initializer), not once per section. Results are returned in
+        DASHBOARD_SECTIONS order regardless of completion order, and any
+        pool failure (including unpicklable analyzers) falls back to
+        serial rendering. Figures are serialized with figure_to_json().
+        """
+        result = result or self.result
+        selected = select_sections(sections, backend)
+        if executor == 'auto':
+            executor = None
+        
+        if executor is not None:
+            workers = max_workers or min(len(selected), os.cpu_count() or 1)
+            try:
+                if executor == 'process':
+                    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                               initargs=(self, result))
+                    submit = lambda method, args: pool.submit(_render_worker_section, method, args, typed_arrays)
+                else:
+                    pool = ThreadPoolExecutor(max_workers=workers)
+                    submit = lambda method, args: pool.submit(_render_section, self, result, method, args, typed_arrays)
+                with pool:
+                    futures = [submit(method, args) for _, method, args, _ in selected]
+                    payloads = [future.result() for future in futures]
+                return dict(zip([name for name, _, _, _ in selected], payloads))
+            except (OSError, NotImplementedError, BrokenProcessPool, pickle.PicklingError, AttributeError,
+                    TypeError) as e:
+                print(f"⚠️ Warning: Parallel rendering unavailable ({e}), rendering serially")
+        
+        return {
+            name: _render_section(self, result, method, args, typed_arrays)
+            for name, method, args, _ in selected
+        }
+    
+    def render_chart_json(self, raw_data, section, typed_arrays=True):
+        """Analyze raw_data and return one chart section's figure JSON
+        
+        Only the analysis stages that chart reads are computed and no other
+        figure is built, e.g. render_chart_json(data, 'intervals') for an
+        endpoint that shows just the safety chart.
+        """
+        (_, method, args, stages), = select_sections([section])
+        if method == 'create_intervals_table_html':
+            raise ValueError("The 'table' section is HTML; use render_table_html()")
+        return _render_section(self, self.analyze(raw_data, stages), method, args, typed_arrays)
+    
+    def render_table_html(self, raw_data):
+        """Analyze raw_data (intervals stage only) and return the intervals table HTML"""
+        return self.create_intervals_table_html(self.analyze(raw_data, SECTION_REGISTRY['table'][3]))
+    
+    def render_stats_json(self, raw_data):
+        """Analyze raw_data (intervals stage only) and return the stat cards as JSON"""
+        stats = self.analyze(raw_data, ('intervals',)).stats
+        return json.dumps({key: stats[key] for key in STAT_CARD_KEYS})
+    
+    def stat_classes(self, stats):
+        """CSS status classes of the maximum-gap and compliance stat cards"""
+        max_gap_status = str(self.rules.classify_intervals(stats['max_interval']))
+        return {
+            'max_interval': 'good' if max_gap_status == 'normal' else max_gap_status,
+            'compliance': stats['compliance'].lower().replace(' ', '_')
+        }
+    
+    def create_dashboard(self, raw_data, executor='auto', max_workers=None, typed_arrays=True, sections=None,
+                         backend='plotly', sidecar=None):
+        """Create comprehensive beautiful HTML dashboard
+        
+        raw_data is the comma-separated clock-time string, an iterable of
+        datetime detections (e.g. from AccelerometerIngestor) or an
+        AnalysisResult from analyze(). The analyzer is not modified, so
+        dashboards can be generated concurrently.
+        
+        sections limits the charts/table included (see DASHBOARD_SECTIONS);
+        stat cards, pattern summary and recommendations are always present.
+        backend='svg' embeds the timeline, hourly and intervals charts as
+        static inline SVG: no plotly.js download, no chart JavaScript, and
+        Plotly is never imported. sidecar (a DashboardSidecar) makes the
+        page poll that sidecar for live detections and stat snapshots.
+        """
+        if self.verbose:
+            print("🎨 Creating beautiful dashboard...")
+        result = raw_data if isinstance(raw_data, AnalysisResult) else self.analyze(raw_data)
+        stats = result.stats
+        if not isinstance(raw_data, str):
+            raw_data = ", ".join(m['time_str'] for m in result.movements)
+        
+        # Build and serialize the selected charts
+        rendered = self.render_sections(executor, max_workers, typed_arrays, sections, result, backend)
+        chart_names = [name for name in rendered if name != 'table']
+        if backend == 'svg':
+            plotly_script = lazy_render_script = ''
+            chart_containers = "\n        \n".join(
+                f'''        <div class="chart-container">
+            <div id="{name}Chart" class="svg-chart">{rendered[name]}</div>
+        </div>'''
+                for name in chart_names
+            )
+            chart_payloads = ''
+            table_container = rendered.get('table', '')
+        else:
+            plotly_script = f'<script src="{PLOTLY_JS_URL}" defer></script>'
+            lazy_render_script = '''        // Configure responsive and beautiful charts
+        const config = {
+            responsive: true,
+            displayModeBar: true,
+            modeBarButtonsToRemove: ['lasso2d', 'select2d'],
+            displaylogo: false,
+            toImageButtonOptions: {
+                format: 'png',
+                filename: 'fetal_movement_chart',
+                height: 500,
+                width: 800,
+                scale: 2
+            }
+        };
+        
+        // Progressive rendering: stat cards paint first, each chart's JSON
+        // payload is parsed and plotted only when it scrolls into view
+        const dashboardTiming = window.dashboardTiming = {};
+        requestAnimationFrame(() => { dashboardTiming.cardsPainted = performance.now(); });
         
-        table_html = """
-        <div class="table-container">
-            <h3 class="table-title">📋 Movement Intervals Analysis</h3>
-            <div class="table-wrapper">
-                <table class="intervals-table">
-                    <thead>
-                        <tr>
-                            <th>From</th>
-                            <th>To</th>
-                            <th>Interval (min)</th>
-                            <th>Status</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-        """
+        function renderLazyElement(element) {
+            if (element.dataset.rendered) return Promise.resolve();
+            element.dataset.rendered = 'true';
+            const template = document.getElementById(element.id + '-template');
+            if (template) {
+                element.appendChild(template.content.cloneNode(true));
+                return Promise.resolve();
+            }
+            const payload = JSON.parse(document.getElementById(element.id + '-data').textContent);
+            return Plotly.newPlot(element.id, payload.data, payload.layout, config);
+        }
         
-        for interval in self.stats['intervals']:
-            status_class = interval['status']
-            status_text = interval['status'].title()
-            status_icon = '🟢' if status_class == 'normal' else '🟡' if status_class == 'monitor' else '🔴'
+        document.addEventListener('DOMContentLoaded', () => {
+            const lazyElements = Array.from(document.querySelectorAll('.lazy-chart, .lazy-section'));
+            const markInteractive = () => { dashboardTiming.interactive = performance.now(); };
             
-            table_html += f"""
-                        <tr class="interval-row {status_class}">
-                            <td><span class="time-badge">{interval['from_time']}</span><br><small>{interval['from_original']}</small></td>
-                            <td><span class="time-badge">{interval['to_time']}</span><br><small>{interval['to_original']}</small></td>
-                            <td><span class="interval-value">{interval['interval']}</span></td>
-                            <td><span class="status-badge {status_class}">{status_icon} {status_text}</span></td>
-                        </tr>
-            """
+            if (!('IntersectionObserver' in window)) {
+                Promise.all(lazyElements.map(renderLazyElement)).then(markInteractive);
+                return;
+            }
+            
+            let firstBatch = true;
+            const observer = new IntersectionObserver((entries) => {
+                const visible = entries.filter(entry => entry.isIntersecting).map(entry => entry.target);
+                visible.forEach(element => observer.unobserve(element));
+                const rendered = Promise.all(visible.map(renderLazyElement));
+                if (firstBatch) {
+                    firstBatch = false;
+                    rendered.then(markInteractive);
+                }
+            }, { rootMargin: '200px 0px' });
+            lazyElements.forEach(element => observer.observe(element));
+        });
         
-        table_html += """
-                    </tbody>
-                </table>
-            </div>
+'''
+            chart_containers = "\n        \n".join(
+                f'''        <div class="chart-container">
+            <div id="{name}Chart" class="lazy-chart"></div>
+        </div>'''
+                for name in chart_names
+            )
+            chart_payloads = "\n".join(
+                f'    <script type="application/json" id="{name}Chart-data">{_escape_script_json(rendered[name])}</script>'
+                for name in chart_names
+            )
+            if 'table' in rendered:
+                table_container = '''        <!-- Movement Intervals Table (inert until scrolled into view) -->
+        <div id="intervalsTable" class="lazy-section"></div>'''
+                chart_payloads += f'\n    <template id="intervalsTable-template">{rendered["table"]}</template>'
+            else:
+                table_container = ''
+        source_counts = stats.get('source_counts')
+        source_item = (
+            f"\n                        <li>Detection sources: "
+            f"{', '.join(f'{html.escape(str(name))} ({count})' for name, count in source_counts.items())}, "
+            f"{stats['collapsed_duplicates']} duplicate reports merged</li>"
+        ) if source_counts else ''
+        stat_classes = self.stat_classes(stats)
+        if sidecar is not None:
+            live_panel = '''
+        <!-- Live updates appended to the data sidecar since this page was written -->
+        <div id="liveUpdates" class="pattern-summary" hidden>
+            <h3>📡 Live Updates <small>(snapshot <span id="liveUpdated"></span>)</small></h3>
+            <p>New detections (stat cards are refreshed now; charts redraw on the next full rebuild):</p>
+            <ul id="liveDetections"></ul>
         </div>
-        """
-        
-        return table_html
-    
-    def create_dashboard(self, raw_data):
-        """Create comprehensive beautiful HTML dashboard"""
-        print("🎨 Creating beautiful dashboard...")
-        stats = self.analyze_movements(raw_data)
+'''
+            sidecar_script = f'''
+    <script>
+        // Apply records appended to the data sidecar after this page was written
+        window.fetalData = {{
+            seq: {sidecar.last_seq},
+            push(record) {{
+                if (record.seq <= this.seq) return;
+                this.seq = record.seq;
+                if (record.type === 'detections') {{
+                    const list = document.getElementById('liveDetections');
+                    record.times.forEach(time => {{
+                        const item = document.createElement('li');
+                        item.textContent = time;
+                        list.appendChild(item);
+                    }});
+                    document.getElementById('liveUpdates').hidden = false;
+                }} else if (record.type === 'stats') {{
+                    Object.entries(record.stats).forEach(([key, value]) => {{
+                        document.querySelectorAll(`[data-stat="${{key}}"]`).forEach(element => {{ element.textContent = value; }});
+                    }});
+                    Object.entries(record.classes).forEach(([key, value]) => {{
+                        document.querySelectorAll(`[data-stat-class="${{key}}"]`).forEach(element => {{ element.className = 'stat-value ' + value; }});
+                    }});
+                    document.getElementById('liveUpdated').textContent = record.generated;
+                }}
+            }}
+        }};
         
-        # Create all charts
-        timeline_chart = self.create_24hour_timeline_chart()
-        hourly_chart = self.create_hourly_distribution_chart()
-        pattern_chart = self.create_pattern_analysis_chart()
-        intervals_chart = self.create_intervals_safety_chart()
-        intervals_table = self.create_intervals_table_html()
+        function pollSidecar() {{
+            const script = document.createElement('script');
+            script.src = {_escape_script_json(json.dumps(sidecar.src))} + '?v=' + Date.now();
+            script.onload = script.onerror = () => script.remove();
+            document.head.appendChild(script);
+        }}
+        pollSidecar();
+        setInterval(pollSidecar, {int(sidecar.poll_seconds * 1000)});
+    </script>
+'''
+        else:
+            live_panel = sidecar_script = ''
+        rules = self.rules
         
         # Generate comprehensive HTML dashboard
         html_content = f"""
@@ -494,7 +2762,7 @@ class FetalMovementAnalyzer:
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>🤱 Professional Fetal Movement Dashboard</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+    {plotly_script}
     <style>
         * {{
             margin: 0;
@@ -585,6 +2853,20 @@ class FetalMovementAnalyzer:
             transition: transform 0.3s ease, box-shadow 0.3s ease;
             position: relative;
             overflow: hidden;
+            opacity: 0;
+            transform: translateY(20px);
+            animation: fadeInUp 0.6s ease forwards;
+        }}
+        
+        .stat-card:nth-child(2) {{ animation-delay: 0.1s; }}
+        .stat-card:nth-child(3) {{ animation-delay: 0.2s; }}
+        .stat-card:nth-child(4) {{ animation-delay: 0.3s; }}
+        
+        @keyframes fadeInUp {{
+            to {{
+                opacity: 1;
+                transform: translateY(0);
+            }}
         }}
         
         .stat-card::before {{
@@ -656,6 +2938,16 @@ class FetalMovementAnalyzer:
             backdrop-filter: blur(10px);
         }}
         
+        .lazy-chart {{
+            min-height: 400px;
+        }}
+        
+        .svg-chart svg {{
+            display: block;
+            width: 100%;
+            height: auto;
+        }}
+        
         .chart-title {{
             font-size: 1.8em;
             font-weight: 700;
@@ -957,69 +3249,54 @@ class FetalMovementAnalyzer:
         <!-- Key Statistics -->
         <div class="stats-grid">
             <div class="stat-card">
-                <div class="stat-value">{stats['total_detections']}</div>
+                <div class="stat-value" data-stat="total_detections">{stats['total_detections']}</div>
                 <div class="stat-label">Total Detections</div>
                 <div class="stat-description">Movement instances recorded</div>
             </div>
             <div class="stat-card">
-                <div class="stat-value">{stats['avg_interval']} min</div>
+                <div class="stat-value"><span data-stat="avg_interval">{stats['avg_interval']}</span> min</div>
                 <div class="stat-label">Average Interval</div>
                 <div class="stat-description">Between detections</div>
             </div>
             <div class="stat-card">
-                <div class="stat-value {'concern' if stats['max_interval'] > 120 else 'monitor' if stats['max_interval'] > 60 else 'good'}">{stats['max_interval']} min</div>
+                <div class="stat-value {stat_classes['max_interval']}" data-stat-class="max_interval"><span data-stat="max_interval">{stats['max_interval']}</span> min</div>
                 <div class="stat-label">Maximum Gap</div>
                 <div class="stat-description">Longest quiet period</div>
             </div>
             <div class="stat-card">
-                <div class="stat-value {stats['compliance'].lower().replace(' ', '_')}">{stats['compliance']}</div>
+                <div class="stat-value {stat_classes['compliance']}" data-stat="compliance" data-stat-class="compliance">{stats['compliance']}</div>
                 <div class="stat-label">Compliance Status</div>
                 <div class="stat-description">Medical assessment</div>
             </div>
         </div>
-        
+        {live_panel}
         <!-- Movement Pattern Summary -->
         <div class="pattern-summary">
             <h3>📊 Daily Movement Pattern Summary</h3>
             <div class="pattern-grid">
                 <div class="pattern-item">
-                    <div class="pattern-value">{stats['morning_movements']}</div>
+                    <div class="pattern-value" data-stat="morning_movements">{stats['morning_movements']}</div>
                     <div class="pattern-label">Morning (6AM-12PM)</div>
                 </div>
                 <div class="pattern-item">
-                    <div class="pattern-value">{stats['afternoon_movements']}</div>
+                    <div class="pattern-value" data-stat="afternoon_movements">{stats['afternoon_movements']}</div>
                     <div class="pattern-label">Afternoon (12PM-6PM)</div>
                 </div>
                 <div class="pattern-item">
-                    <div class="pattern-value">{stats['evening_movements']}</div>
+                    <div class="pattern-value" data-stat="evening_movements">{stats['evening_movements']}</div>
                     <div class="pattern-label">Evening (6PM-12AM)</div>
                 </div>
                 <div class="pattern-item">
-                    <div class="pattern-value">{stats['night_movements']}</div>
+                    <div class="pattern-value" data-stat="night_movements">{stats['night_movements']}</div>
                     <div class="pattern-label">Night (12AM-6AM)</div>
                 </div>
             </div>
         </div>
         
         <!-- Charts -->
-        <div class="chart-container">
-            <div id="timelineChart"></div>
-        </div>
-        
-        <div class="chart-container">
-            <div id="hourlyChart"></div>
-        </div>
+{chart_containers}
         
-        <div class="chart-container">
-            <div id="patternChart"></div>
-        </div>
-        
-        <div class="chart-container">
-            <div id="intervalsChart"></div>
-        </div>
-        
-        <!-- Movement Intervals Table -->
-        {intervals_table}
+{table_container}
         
         <!-- Medical Recommendations -->
         <div class="recommendations">
@@ -1033,18 +3310,22 @@ class FetalMovementAnalyzer:
                         <li>Normal intervals: {stats['normal_intervals']}</li>
                         <li>Monitor intervals: {stats['monitor_intervals']}</li>
                         <li>Concerning intervals: {stats['concern_intervals']}</li>
+                        <li>Movement episodes: {stats['episode_count']} (avg {stats['avg_episode_size']} detections, longest quiet gap {stats['max_episode_gap']} min)</li>
                         <li>Overall assessment: {stats['compliance']}</li>
-                        <li>Peak activity period: {'Morning' if stats['morning_movements'] == max(stats['morning_movements'], stats['afternoon_movements'], stats['evening_movements'], stats['night_movements']) else 'Afternoon' if stats['afternoon_movements'] == max(stats['morning_movements'], stats['afternoon_movements'], stats['evening_movements'], stats['night_movements']) else 'Evening' if stats['evening_movements'] == max(stats['morning_movements'], stats['afternoon_movements'], stats['evening_movements'], stats['night_movements']) else 'Night'}</li>
+                        <li>Rejected entries: {stats['rejected_tokens']}</li>{source_item}
+                        <li>Activity change points: {', '.join(f"Day {c['day'] + 1} {c['direction']} ({c['detections_before']} → {c['detections_after']}/day)" for c in stats['change_points']) or 'None'}{' ⚠️ sustained drop' if stats['activity_drop'] else ''}</li>
+                        <li>Hours below personal baseline: {', '.join(f"{h:02d}:00" for h in stats['baseline_low_hours']) or 'None'}</li>
+                        <li>Peak activity: <span data-stat="peak_activity_time">{stats['peak_activity_time']}</span> (<span data-stat="peak_activity_period">{stats['peak_activity_period']}</span>)</li>
                     </ul>
                 </div>
                 <div>
                     <h4>Medical Guidelines:</h4>
                     <ul>
                         <li>Monitor for 10 movements in 2 hours</li>
-                        <li>Contact provider if no movement >2 hours</li>
-                        <li>Normal: Intervals <60 minutes</li>
-                        <li>Monitor: Intervals 60-120 minutes</li>
-                        <li>Alert: Intervals >120 minutes</li>
+                        <li>Contact provider if no movement >{rules.concern_minutes} minutes</li>
+                        <li>Normal: Intervals ≤{rules.monitor_minutes} minutes</li>
+                        <li>Monitor: Intervals {rules.monitor_minutes}-{rules.concern_minutes} minutes</li>
+                        <li>Alert: Intervals >{rules.concern_minutes} minutes</li>
                         <li>Maintain consistent daily monitoring</li>
                         <li>Record any concerning pattern changes</li>
                         <li>Most active periods typically evening</li>
@@ -1055,34 +3336,7 @@ class FetalMovementAnalyzer:
     </div>
     
     <script>
-        // Chart configurations with enhanced styling
-        const timelineData = {timeline_chart.to_json()};
-        const hourlyData = {hourly_chart.to_json()};
-        const patternData = {pattern_chart.to_json()};
-        const intervalsData = {intervals_chart.to_json()};
-        
-        // Configure responsive and beautiful charts
-        const config = {{
-            responsive: true,
-            displayModeBar: true,
-            modeBarButtonsToRemove: ['lasso2d', 'select2d'],
-            displaylogo: false,
-            toImageButtonOptions: {{
-                format: 'png',
-                filename: 'fetal_movement_chart',
-                height: 500,
-                width: 800,
-                scale: 2
-            }}
-        }};
-        
-        // Render all charts with beautiful styling
-        Plotly.newPlot('timelineChart', timelineData.data, timelineData.layout, config);
-        Plotly.newPlot('hourlyChart', hourlyData.data, hourlyData.layout, config);
-        Plotly.newPlot('patternChart', patternData.data, patternData.layout, config);
-        Plotly.newPlot('intervalsChart', intervalsData.data, intervalsData.layout, config);
-        
-        function updateDashboard() {{
+{lazy_render_script}        function updateDashboard() {{
             const newData = document.getElementById('movementData').value;
             if (newData.trim()) {{
                 // Create download link for new data
@@ -1102,38 +3356,845 @@ class FetalMovementAnalyzer:
                 alert('⚠️ Please enter movement detection data first.');
             }}
         }}
-        
-        // Add smooth scroll animations
-        document.querySelectorAll('.stat-card').forEach((card, index) => {{
-            card.style.animation = `fadeInUp 0.6s ease forwards ${{index * 0.1}}s`;
-            card.style.opacity = '0';
-            card.style.transform = 'translateY(20px)';
-        }});
-        
-        // CSS animations
-        const style = document.createElement('style');
-        style.textContent = `
-            @keyframes fadeInUp {{
-                to {{
-                    opacity: 1;
-                    transform: translateY(0);
-                }}
-            }}
-        `;
-        document.head.appendChild(style);
     </script>
+    {sidecar_script}
+    <!-- Deferred section payloads, parsed only when scrolled into view -->
+{chart_payloads}
 </body>
 </html>
 """
         
         return html_content
 
+
+def _require_pyarrow():
+    """Import pyarrow lazily; it is only needed for Arrow/Parquet export"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Arrow/Parquet export requires pyarrow: pip install pyarrow") from None
+    return pa, pq
+
+
+def export_dataset(patients, root, batch_size=500, rules=None):
+    """Append many patients into one Parquet dataset partitioned by patient_id
+    
+    patients maps patient_id -> movement data (clock-time string or
+    datetimes). Tables are buffered for batch_size patients and written in
+    one go, giving <root>/<table>/patient_id=<id>/ partitions. Existing
+    files are kept, so repeated calls append.
+    """
+    pa, pq = _require_pyarrow()
+    buffered = {}
+    
+    def flush():
+        for name, tables in buffered.items():
+            pq.write_to_dataset(pa.concat_tables(tables), os.path.join(root, name),
+                                partition_cols=['patient_id'])
+        buffered.clear()
+    
+    exported = 0
+    for patient_id, raw_data in patients.items():
+        analyzer = FetalMovementAnalyzer(verbose=False, rules=rules)
+        for name, table in analyzer.to_arrow(patient_id, analyzer.analyze(raw_data)).items():
+            buffered.setdefault(name, []).append(table)
+        exported += 1
+        if exported % batch_size == 0:
+            flush()
+    flush()
+    
+    print(f"📦 Exported {exported} patients to {root}")
+    return exported
+
+
+PORTFOLIO_MANIFEST = "portfolio_manifest.json"
+
+# Rebuilt patients between manifest checkpoints during build_portfolio()
+PORTFOLIO_CHECKPOINT_EVERY = 25
+
+PORTFOLIO_INDEX_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>🤱 Fetal Movement Portfolio</title>
+    <style>
+        body {{ font-family: 'Segoe UI', -apple-system, BlinkMacSystemFont, 'Roboto', sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); min-height: 100vh; padding: 20px; }}
+        .container {{ max-width: 1400px; margin: 0 auto; background: rgba(255, 255, 255, 0.98); border-radius: 25px; padding: 40px; box-shadow: 0 25px 50px rgba(0, 0, 0, 0.15); }}
+        h1 {{ color: #4f46e5; margin-bottom: 10px; }}
+        .summary {{ color: #64748b; margin-bottom: 25px; font-weight: 600; }}
+        table {{ width: 100%; border-collapse: collapse; background: white; }}
+        th {{ background: linear-gradient(135deg, #667eea, #764ba2); color: white; padding: 14px; }}
+        td {{ padding: 12px; text-align: center; border-bottom: 1px solid #e5e7eb; }}
+        .status-badge {{ padding: 6px 14px; border-radius: 25px; font-weight: 700; color: white; }}
+        .status-badge.normal {{ background: #10b981; }}
+        .status-badge.monitor {{ background: #f59e0b; }}
+        .status-badge.concern {{ background: #ef4444; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🤱 Fetal Movement Portfolio</h1>
+        <p class="summary">{patient_count} patients · {concern_count} with concerning intervals · updated {updated}</p>
+        <table>
+            <thead>
+                <tr><th>Patient</th><th>Detections</th><th>Max Gap (min)</th><th>Concern Intervals</th><th>Compliance</th><th>Updated</th></tr>
+            </thead>
+            <tbody>
+{rows}
+            </tbody>
+        </table>
+    </div>
+</body>
+</html>
+"""
+
+
+def _write_atomic(path, content):
+    """Write a text file via a temporary file so readers never see it half-written"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+def _portfolio_source(source, previous):
+    """Return (data, fingerprint, file_key) for a patient input, reusing unchanged file hashes
+    
+    source is the movement data string itself or an os.PathLike pointing at
+    a text file containing it. Files whose size and mtime match the
+    manifest are not read at all.
+    """
+    if isinstance(source, os.PathLike):
+        info = os.stat(source)
+        file_key = [os.fspath(source), info.st_size, info.st_mtime_ns]
+        if previous and previous.get('file_key') == file_key:
+            return None, previous['fingerprint'], file_key
+        with open(source, encoding='utf-8') as f:
+            data = f.read()
+        return data, hashlib.sha1(data.encode('utf-8')).hexdigest(), file_key
+    return source, hashlib.sha1(source.encode('utf-8')).hexdigest(), None
+
+
+def _portfolio_row(patient_id, output, summary):
+    """Index table row for one patient"""
+    status = str(summary['status'])
+    return (
+        f'                <tr id="patient-{html.escape(patient_id)}">'
+        f'<td><a href="{html.escape(output)}">{html.escape(patient_id)}</a></td>'
+        f'<td>{summary["total_detections"]}</td>'
+        f'<td>{summary["max_interval"]}</td>'
+        f'<td>{summary["concern_intervals"]}</td>'
+        f'<td><span class="status-badge {status}">{STATUS_ICONS[status]} {html.escape(summary["compliance"])}</span></td>'
+        f'<td>{summary["updated"]}</td></tr>'
+    )
+
+
+def build_portfolio(patients, output_dir, rules=None, prune=False, checkpoint_every=PORTFOLIO_CHECKPOINT_EVERY):
+    """Incrementally build dashboards for a whole ward plus an index page
+    
+    patients maps patient_id -> movement data string or path (os.PathLike)
+    to a text file. A manifest in output_dir records each patient's input
+    fingerprint, output file, summary stats and index row; only patients
+    whose fingerprint (or the rule set) changed are re-analyzed and
+    re-rendered. The index is reassembled from the stored rows, so
+    unchanged patients cost nothing, and it is not touched at all when
+    nothing changed. prune=True drops manifest entries for patients no
+    longer listed. Returns the list of rebuilt patient ids.
+    
+    The manifest is saved every checkpoint_every rebuilt patients, so an
+    interrupted build keeps the dashboards it already wrote (the index is
+    then marked stale and rewritten by the next run). A patient whose
+    dashboard fails is recorded under the manifest's 'failed' key with the
+    error and retried next time; the rest of the ward still builds.
+    """
+    rules = rules or DEFAULT_RULES
+    rules_key = hashlib.sha1(json.dumps(rules.to_dict(), sort_keys=True).encode('utf-8')).hexdigest()
+    manifest_path = os.path.join(output_dir, PORTFOLIO_MANIFEST)
+    os.makedirs(os.path.join(output_dir, 'patients'), exist_ok=True)
+    
+    manifest = {'rules': rules_key, 'patients': {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    entries = manifest['patients'] if manifest.get('rules') == rules_key else {}
+    previous_failures = manifest.get('failed', {})
+    failed = {}
+    
+    def save_manifest(index_stale):
+        _write_atomic(manifest_path, json.dumps({'rules': rules_key, 'patients': entries, 'failed': failed,
+                                                 'index_stale': index_stale}))
+    
+    rebuilt = []
+    index_changed = len(entries) != len(manifest['patients']) or manifest.get('index_stale', False)
+    manifest_changed = index_changed
+    for patient_id, source in patients.items():
+        patient_id = str(patient_id)
+        previous = entries.get(patient_id)
+        data, fingerprint, file_key = _portfolio_source(source, previous)
+        if previous and previous['fingerprint'] == fingerprint:
+            if previous.get('file_key') != file_key:
+                previous['file_key'] = file_key  # touched but identical content: manifest only
+                manifest_changed = True
+            continue
+        
+        try:
+            analyzer = FetalMovementAnalyzer(verbose=False, rules=rules)
+            result = analyzer.analyze(data)
+            dashboard = analyzer.create_dashboard(result)
+        except Exception as e:
+            print(f"⚠️ Warning: Could not build dashboard for {patient_id}: {e}")
+            failed[patient_id] = {'fingerprint': fingerprint, 'error': f"{type(e).__name__}: {e}"}
+            manifest_changed = True
+            continue
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', patient_id)
+        output = f"patients/{safe_name}-{hashlib.sha1(patient_id.encode('utf-8')).hexdigest()[:8]}.html"
+        _write_atomic(os.path.join(output_dir, output), dashboard)
+        
+        stats = result.stats
+        summary = {
+            'total_detections': stats['total_detections'],
+            'max_interval': stats['max_interval'],
+            'concern_intervals': stats['concern_intervals'],
+            'compliance': stats['compliance'],
+            'status': str(rules.classify_intervals(stats['max_interval'])),
+            'updated': dt.now().strftime('%Y-%m-%d %H:%M'),
+        }
+        entries[patient_id] = {
+            'fingerprint': fingerprint,
+            'file_key': file_key,
+            'output': output,
+            'summary': summary,
+            'row': _portfolio_row(patient_id, output, summary),
+        }
+        rebuilt.append(patient_id)
+        index_changed = manifest_changed = True
+        if len(rebuilt) % checkpoint_every == 0:
+            save_manifest(index_stale=True)
+    
+    if prune:
+        listed = {str(patient_id) for patient_id in patients}
+        for patient_id in [p for p in entries if p not in listed]:
+            del entries[patient_id]
+            index_changed = manifest_changed = True
+    
+    if index_changed:
+        _write_atomic(os.path.join(output_dir, 'index.html'), PORTFOLIO_INDEX_TEMPLATE.format(
+            patient_count=len(entries),
+            concern_count=sum(1 for e in entries.values() if e['summary']['concern_intervals']),
+            updated=dt.now().strftime('%Y-%m-%d %H:%M:%S'),
+            rows='\n'.join(entries[p]['row'] for p in sorted(entries))
+        ))
+    if manifest_changed or failed != previous_failures:
+        save_manifest(index_stale=False)
+    
+    print(f"🏥 Portfolio: {len(rebuilt)} rebuilt, {len(entries) - len(rebuilt)} unchanged"
+          + (f", {len(failed)} failed" if failed else ""))
+    return rebuilt
+
+
+class DashboardSidecar:
+    """Append-only data file that a dashboard page polls for live updates
+    
+    write_dashboard() writes the HTML page once. add_detections() then
+    appends a detections record and a stats snapshot to <page>.data.js
+    instead of rewriting the page. Each record is one line,
+    fetalData.push({...});, so the page loads the sidecar with a plain
+    <script> tag (which works from file://, unlike fetch()), re-polls it
+    every poll_seconds and applies only records newer than it has seen.
+    Earlier bytes are never rewritten, which also keeps file-sync tools to
+    small deltas. The cumulative detections are re-read from the sidecar,
+    so each snapshot covers the whole monitoring session. activity_cube is
+    the session's day x bin matrix, kept across calls: each update adds
+    only the new detections' day rows.
+    """
+    
+    RECORD_PREFIX = 'fetalData.push('
+    
+    def __init__(self, html_path, analyzer=None, poll_seconds=SIDECAR_POLL_SECONDS):
+        self.html_path = html_path
+        self.path = os.path.splitext(html_path)[0] + SIDECAR_SUFFIX
+        self.analyzer = analyzer or FetalMovementAnalyzer(verbose=False)
+        self.poll_seconds = poll_seconds
+        self.last_seq = 0
+        self.activity_cube = None
+    
+    @property
+    def src(self):
+        """Sidecar URL relative to the dashboard page"""
+        return os.path.basename(self.path)
+    
+    def exists(self):
+        return os.path.exists(self.html_path) and os.path.exists(self.path)
+    
+    def records(self):
+        """Parse every record appended so far"""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding='utf-8') as f:
+            records = [
+                json.loads(line[len(self.RECORD_PREFIX):-2])
+                for line in (line.rstrip('\n') for line in f)
+                if line.startswith(self.RECORD_PREFIX)
+            ]
+        self.last_seq = records[-1]['seq'] if records else 0
+        return records
+    
+    def movement_data(self, records=None):
+        """All detection tokens recorded in the sidecar, as one movement string"""
+        records = self.records() if records is None else records
+        return ", ".join(token for record in records if record['type'] == 'detections' for token in record['times'])
+    
+    def _snapshot(self, stats):
+        """Stat-card and pattern values the page displays, plus their CSS classes"""
+        return {
+            'type': 'stats',
+            'generated': dt.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'stats': {key: stats[key] for key in SIDECAR_STAT_KEYS},
+            'classes': self.analyzer.stat_classes(stats)
+        }
+    
+    def _append(self, records, mode='a'):
+        """Number the records and append them as script lines in one write"""
+        lines = []
+        for record in records:
+            self.last_seq += 1
+            lines.append(f"{self.RECORD_PREFIX}{json.dumps({'seq': self.last_seq, **record})});\n")
+        with open(self.path, mode, encoding='utf-8') as f:
+            f.write("".join(lines))
+    
+    def write_dashboard(self, raw_data):
+        """Start a session: write the sidecar and the page that polls it"""
+        tokens = [t.strip() for t in raw_data.split(',') if t.strip()]
+        result = self.analyzer.analyze(", ".join(tokens))
+        self.activity_cube = add_days(ActivityCube(self.analyzer.cube_bin_minutes), result.movements)
+        self.last_seq = 0
+        self._append([{'type': 'detections', 'times': tokens}, self._snapshot(result.stats)], mode='w')
+        _write_atomic(self.html_path, self.analyzer.create_dashboard(result, sidecar=self))
+        return result
+    
+    def add_detections(self, new_data):
+        """Append new detection times and a fresh stats snapshot (no page rewrite)"""
+        records = self.records()
+        tokens = [t.strip() for t in new_data.split(',') if t.strip()]
+        previous = [token for record in records if record['type'] == 'detections' for token in record['times']]
+        result = self.analyzer.analyze(", ".join(previous + tokens), ('intervals', 'histograms'))
+        
+        # Movement ids are token positions, so the new detections are the ids past the old tokens
+        if self.activity_cube is None:
+            self.activity_cube = ActivityCube(self.analyzer.cube_bin_minutes)
+            new_movements = result.movements
+        else:
+            new_movements = [m for m in result.movements if m['id'] > len(previous)]
+        add_days(self.activity_cube, new_movements)
+        self._append([{'type': 'detections', 'times': tokens}, self._snapshot(result.stats)])
+        return result
+
+
+def _escape_script_json(payload):
+    """Make a JSON payload safe to embed in a <script> element"""
+    return payload.replace('</', '<\\/')
+
+
+def measure_time_to_interactive(html_content, timeout_ms=30000):
+    """Load a dashboard in headless Chromium and return its timing marks (ms)
+    
+    Needs the optional playwright package with its Chromium build (and
+    network access for plotly.js); returns None when it is unavailable.
+    """
+    try:
+        from playwright.sync_api import sync_playwright, Error as PlaywrightError
+    except ImportError:
+        return None
+    
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'dashboard.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        with sync_playwright() as playwright:
+            try:
+                browser = playwright.chromium.launch()
+            except PlaywrightError as e:
+                print(f"⚠️ Warning: Headless browser unavailable: {str(e).splitlines()[0]}")
+                return None
+            try:
+                page = browser.new_page()
+                page.goto(f"file://{path}")
+                page.wait_for_function("window.dashboardTiming && window.dashboardTiming.interactive !== undefined",
+                                       timeout=timeout_ms)
+                return page.evaluate("window.dashboardTiming")
+            finally:
+                browser.close()
+
+
+def select_sections(names=None, backend='plotly'):
+    """Return the DASHBOARD_SECTIONS entries for names, in assembly order
+    
+    With backend='svg' the builder method of each entry is its
+    SVG_SECTION_BUILDERS counterpart, and names defaults to those sections.
+    """
+    available = SECTION_REGISTRY if backend == 'plotly' else SVG_SECTION_BUILDERS
+    if backend not in ('plotly', 'svg'):
+        raise ValueError(f"Unknown render backend {backend!r} (choose 'plotly' or 'svg')")
+    names = set(available) if names is None else set([names] if isinstance(names, str) else names)
+    unknown = names - set(available)
+    if unknown:
+        raise ValueError(f"Unknown {backend} dashboard section(s): {', '.join(sorted(unknown))} "
+                         f"(choose from {', '.join(available)})")
+    return tuple(
+        section if backend == 'plotly' else (section[0], SVG_SECTION_BUILDERS[section[0]], (), section[3])
+        for section in DASHBOARD_SECTIONS if section[0] in names
+    )
+
+
+def _render_section(analyzer, result, method, args, typed_arrays=True):
+    """Build one dashboard section of result, serialized (HTML or figure JSON)"""
+    section = getattr(analyzer, method)(result, *args)
+    return section if isinstance(section, str) else figure_to_json(section, typed_arrays)
+
+
+# (analyzer, result) of a render process-pool worker, set once by its initializer
+_render_worker_state = None
+
+
+def _init_render_worker(analyzer, result):
+    global _render_worker_state
+    _render_worker_state = (analyzer, result)
+
+
+def _render_worker_section(method, args, typed_arrays=True):
+    """Process-pool entry point: render one section of the worker's result"""
+    analyzer, result = _render_worker_state
+    return _render_section(analyzer, result, method, args, typed_arrays)
+
+
+class AlertScheduler:
+    """Fire monitor/concern alerts the moment a patient's silence crosses a threshold
+    
+    Pending alerts live in one min-heap keyed by due time, so recording a
+    detection and firing an alert are O(log n) for n pending alerts. A new
+    detection does not search the heap: it gives the patient a new
+    generation (unique across the scheduler), which marks their older
+    timers stale, and pushes fresh ones. Stale entries are skipped when
+    popped and compacted away if they pile up.
+    """
+    
+    def __init__(self, rules=None, on_alert=None):
+        self.rules = rules or DEFAULT_RULES
+        self.thresholds = [(level, timedelta(minutes=minutes)) for level, minutes in self.rules.alert_thresholds]
+        self.on_alert = on_alert
+        self._heap = []
+        self._last_detection = {}
+        self._generation = {}
+        self._sequence = itertools.count()
+    
+    def __len__(self):
+        """Number of monitored patients"""
+        return len(self._last_detection)
+    
+    def last_detection(self, patient_id):
+        """Time of the patient's most recent detection, or None"""
+        return self._last_detection.get(patient_id)
+    
+    def record_detection(self, patient_id, when):
+        """Register a detection and reschedule the patient's alert timers"""
+        last = self._last_detection.get(patient_id)
+        if last is not None and when <= last:
+            return  # Late, out-of-order detection: current timers already cover it
+        
+        # Generations come from the scheduler-wide counter, so a removed and
+        # re-added patient can never revive timers from before the removal
+        generation = next(self._sequence)
+        self._generation[patient_id] = generation
+        self._last_detection[patient_id] = when
+        for level, delay in self.thresholds:
+            heapq.heappush(self._heap, (when + delay, next(self._sequence), patient_id, generation, level))
+        
+        # Each detection leaves its previous timers stale; compact when they dominate
+        if len(self._heap) > 4 * len(self.thresholds) * len(self._generation) + 64:
+            self._heap = [entry for entry in self._heap if self._generation.get(entry[2]) == entry[3]]
+            heapq.heapify(self._heap)
+    
+    def remove_patient(self, patient_id):
+        """Stop monitoring a patient (their pending timers become stale)"""
+        self._last_detection.pop(patient_id, None)
+        self._generation.pop(patient_id, None)
+    
+    def _drop_stale(self):
+        while self._heap and self._generation.get(self._heap[0][2]) != self._heap[0][3]:
+            heapq.heappop(self._heap)
+    
+    def next_due(self):
+        """Due time of the earliest pending alert, or None"""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+    
+    def advance(self, now):
+        """Fire every alert due at or before now and return them in due order"""
+        alerts = []
+        self._drop_stale()
+        while self._heap and self._heap[0][0] <= now:
+            due, _, patient_id, generation, level = heapq.heappop(self._heap)
+            last = self._last_detection[patient_id]
+            alert = {
+                'patient_id': patient_id,
+                'level': level,
+                'due': due,
+                'last_detection': last,
+                'silence_minutes': round((now - last).total_seconds() / 60)
+            }
+            alerts.append(alert)
+            if self.on_alert is not None:
+                self.on_alert(alert)
+            self._drop_stale()
+        return alerts
+
+
+class QuantileSketch:
+    """Mergeable, fixed-size quantile sketch for interval durations
+    
+    Values are counted in logarithmically spaced buckets (DDSketch-style),
+    so every quantile is within relative_accuracy of the true value and
+    merging two sketches is an element-wise addition. Memory is one fixed
+    integer array no matter how many values are added; values above
+    max_value are counted in the top bucket.
+    """
+    
+    def __init__(self, relative_accuracy=0.01, min_value=0.5, max_value=14 * MINUTES_PER_DAY):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self._gamma)
+        self._offset = int(np.floor(np.log(min_value) / self._log_gamma))
+        n_buckets = int(np.ceil(np.log(max_value) / self._log_gamma)) - self._offset + 1
+        self.buckets = np.zeros(n_buckets, dtype=np.int64)
+        self.zero_count = 0
+        self.count = 0
+    
+    def add(self, values):
+        """Add an array of non-negative values"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        positive = values[values > 0]
+        self.zero_count += len(values) - len(positive)
+        self.count += len(values)
+        
+        index = np.ceil(np.log(np.clip(positive, self.min_value, self.max_value)) / self._log_gamma).astype(np.int64)
+        self.buckets += np.bincount(index - self._offset, minlength=len(self.buckets))
+    
+    def merge(self, other):
+        """Fold another sketch with the same parameters into this one"""
+        if len(other.buckets) != len(self.buckets) or other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Can only merge sketches built with the same parameters")
+        self.buckets += other.buckets
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+    
+    def quantiles(self, qs):
+        """Estimate several quantiles (0..1) at once"""
+        if self.count == 0:
+            return [0.0] * len(qs)
+        
+        ranks = np.asarray(qs, dtype=np.float64) * (self.count - 1)
+        cumulative = np.cumsum(self.buckets) + self.zero_count
+        bucket = np.searchsorted(cumulative, ranks, side='right')
+        values = 2 * self._gamma ** (bucket + self._offset) / (self._gamma + 1)
+        return np.where(ranks < self.zero_count, 0.0, values).tolist()
+    
+    def quantile(self, q):
+        """Estimate a single quantile (0..1)"""
+        return self.quantiles([q])[0]
+
+
+class CohortAggregator:
+    """Cohort-wide interval percentiles and hourly activity by gestational week
+    
+    Each group keeps one QuantileSketch of inter-detection intervals and a
+    24-bin hourly count vector, so memory per group is fixed regardless of
+    cohort size. Aggregators built on separate workers combine with merge().
+    """
+    
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.groups = {}
+    
+    def _group(self, key):
+        group = self.groups.get(key)
+        if group is None:
+            group = {
+                'patients': 0,
+                'detections': 0,
+                'intervals': QuantileSketch(self.relative_accuracy),
+                'hourly_counts': np.zeros(24, dtype=np.int64)
+            }
+            self.groups[key] = group
+        return group
+    
+    def add_stats(self, stats, gestational_week):
+        """Add one patient's analyzer stats to its gestational-week group"""
+        group = self._group(gestational_week)
+        group['patients'] += 1
+        group['detections'] += stats['total_detections']
+        group['intervals'].add([i['interval'] for i in stats['intervals']])
+        group['hourly_counts'] += stats['activity_histograms'][60]
+    
+    def add_patient(self, raw_data, gestational_week):
+        """Analyze one patient's detections (intervals and histograms only) and add them to the cohort"""
+        stats = FetalMovementAnalyzer(verbose=False).analyze(raw_data, ('intervals', 'histograms')).stats
+        self.add_stats(stats, gestational_week)
+    
+    def merge(self, other):
+        """Fold another aggregator (e.g. from a worker process) into this one"""
+        for key, theirs in other.groups.items():
+            group = self._group(key)
+            group['patients'] += theirs['patients']
+            group['detections'] += theirs['detections']
+            group['intervals'].merge(theirs['intervals'])
+            group['hourly_counts'] += theirs['hourly_counts']
+        return self
+    
+    def summary(self, quantiles=(0.5, 0.9, 0.99)):
+        """Per-week patient counts, interval percentiles and mean hourly activity"""
+        result = {}
+        for key in sorted(self.groups):
+            group = self.groups[key]
+            values = group['intervals'].quantiles(quantiles)
+            result[key] = {
+                'patients': group['patients'],
+                'detections': group['detections'],
+                'intervals': group['intervals'].count,
+                **{f"p{round(q * 100):g}_interval": round(v, 1) for q, v in zip(quantiles, values)},
+                'hourly_mean': (group['hourly_counts'] / max(group['patients'], 1)).round(2).tolist()
+            }
+        return result
+
+
+def _aggregate_cohort_chunk(patients, relative_accuracy):
+    """Worker entry point: aggregate a list of (raw_data, gestational_week)"""
+    aggregator = CohortAggregator(relative_accuracy)
+    for raw_data, gestational_week in patients:
+        aggregator.add_patient(raw_data, gestational_week)
+    return aggregator
+
+
+def aggregate_cohort(patients, max_workers=None, chunk_size=200, relative_accuracy=0.01):
+    """Aggregate (raw_data, gestational_week) pairs across a process pool
+    
+    Each worker builds a partial CohortAggregator over a chunk of patients;
+    partial results are merged as they complete. At most two chunks per
+    worker are in flight, so patients are read from the iterable only as
+    workers free up. max_workers=0 runs serially.
+    """
+    aggregator = CohortAggregator(relative_accuracy)
+    patients = iter(patients)
+    chunks = iter(lambda: [p for _, p in zip(range(chunk_size), patients)], [])
+    
+    if max_workers == 0:
+        for chunk in chunks:
+            aggregator.merge(_aggregate_cohort_chunk(chunk, relative_accuracy))
+        return aggregator
+    
+    window = 2 * (max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(_aggregate_cohort_chunk, chunk, relative_accuracy))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    aggregator.merge(future.result())
+        for future in as_completed(pending):
+            aggregator.merge(future.result())
+    return aggregator
+
+
+@pd.api.extensions.register_dataframe_accessor('fetal')
+class FetalMovementAccessor:
+    """df.fetal: analyze detection tables without formatting them as strings
+    
+    Reads a datetime64 column directly (the only datetime column unless
+    column= names one); timezone-aware times are analyzed as local wall
+    time and NaT rows are ignored. Many patients in one frame are
+    summarized with df.fetal.stats(by='patient'), which computes every
+    group in one vectorized pass instead of looping over groups.
+    """
+    
+    def __init__(self, frame):
+        self._frame = frame
+    
+    def _times(self, column=None):
+        """The detection-time column as a Series"""
+        if column is None:
+            columns = [name for name, dtype in self._frame.dtypes.items() if pd.api.types.is_datetime64_any_dtype(dtype)]
+            if len(columns) != 1:
+                raise ValueError(f"Expected one datetime64 column, found {len(columns)}; pass column=")
+            column = columns[0]
+        times = self._frame[column]
+        if not pd.api.types.is_datetime64_any_dtype(times.dtype):
+            raise ValueError(f"Column {column!r} is not datetime64")
+        if times.dt.tz is not None:
+            times = times.dt.tz_localize(None)
+        return times
+    
+    def analyze(self, column=None, analyzer=None, stages=ANALYSIS_STAGES):
+        """Analyze every detection in the frame and return an AnalysisResult"""
+        analyzer = analyzer or FetalMovementAnalyzer()
+        times = self._times(column).dropna().to_numpy(dtype='datetime64[us]')
+        return analyzer.analyze(np.sort(times).tolist(), stages)
+    
+    def dashboard(self, column=None, analyzer=None, **options):
+        """Dashboard HTML for the frame's detections (options go to create_dashboard)"""
+        analyzer = analyzer or FetalMovementAnalyzer()
+        return analyzer.create_dashboard(self.analyze(column, analyzer), **options)
+    
+    def stats(self, by=None, column=None, rules=None):
+        """Per-group stat-card values as a DataFrame indexed by the by keys
+        
+        Rows are sorted by (group, time) once; intervals are the time
+        differences within each group, evaluated with ThresholdRules in
+        one pass. Without by, the whole frame is one group. Values match
+        analyze() on each group's detections.
+        """
+        rules = rules or DEFAULT_RULES
+        times = self._times(column).to_numpy(dtype='datetime64[us]').view(np.int64)
+        if by is None:
+            groups = np.zeros(len(times), dtype=np.int64)
+            keys = pd.RangeIndex(1)
+        else:
+            grouped = self._frame.groupby(by, sort=True)
+            groups = grouped.ngroup().to_numpy(dtype=np.int64)
+            keys = grouped.size().index
+        n_groups = len(keys)
+        
+        valid = (times != np.iinfo(np.int64).min) & (groups >= 0)
+        times, groups = times[valid], groups[valid]
+        order = np.lexsort((times, groups))
+        times, groups = times[order], groups[order]
+        
+        # Intervals between consecutive detections of the same group
+        same_group = groups[1:] == groups[:-1]
+        interval_minutes = (np.diff(times) / 60e6)[same_group]
+        interval_groups = groups[1:][same_group]
+        evaluated = rules.evaluate_grouped(interval_minutes, interval_groups, n_groups)
+        rounded = np.round(interval_minutes)
+        interval_counts = np.bincount(interval_groups, minlength=n_groups)
+        mean_intervals = np.bincount(interval_groups, rounded, minlength=n_groups) / np.maximum(interval_counts, 1)
+        min_intervals = np.full(n_groups, np.inf)
+        np.minimum.at(min_intervals, interval_groups, rounded)
+        
+        hours = times // 3_600_000_000 % 24
+        period_index = np.searchsorted([start for _, start, _ in DAY_PERIODS[1:]], hours, side='right')
+        period_counts = np.zeros((n_groups, len(DAY_PERIODS)), dtype=np.int64)
+        np.add.at(period_counts, (groups, period_index), 1)
+        
+        table = pd.DataFrame({
+            'total_detections': np.bincount(groups, minlength=n_groups),
+            # Python's round() to match analyze() exactly (np.round can differ at ties)
+            'avg_interval': [round(value, 1) for value in mean_intervals.tolist()],
+            'max_interval': evaluated['max_interval'].astype(np.int64),
+            'min_interval': np.where(interval_counts > 0, min_intervals, 0).astype(np.int64),
+            'normal_intervals': evaluated['normal_intervals'],
+            'monitor_intervals': evaluated['monitor_intervals'],
+            'concern_intervals': evaluated['concern_intervals'],
+            'compliance': evaluated['compliance'],
+        }, index=keys)
+        for i, (name, _, _) in enumerate(DAY_PERIODS):
+            table[f'{name}_movements'] = period_counts[:, i]
+        return table
+
+
+def synthetic_movement_data(n_detections, seed=0):
+    """Generate a chronological multi-day detection log for benchmarking"""
+    rng = np.random.default_rng(seed)
+    minutes = np.cumsum(rng.exponential(45, n_detections)).astype(np.int64) % MINUTES_PER_DAY
+    return ", ".join(format_minute_of_day(m) for m in minutes)
+
+
+def benchmark_dashboard(raw_data=None, repeat=3):
+    """Report serialization time and HTML size with and without typed arrays
+    
+    Also times rendering every section serially against thread and process
+    pools (wall-clock, pool start-up included).
+    """
+    raw_data = raw_data or synthetic_movement_data(5000)
+    analyzer = FetalMovementAnalyzer()
+    result = analyzer.analyze(raw_data)
+    figures = [
+        getattr(analyzer, method)(result, *args)
+        for _, method, args, _ in DASHBOARD_SECTIONS
+        if method != 'create_intervals_table_html'
+    ]
+    
+    report = {'detections': result.total_detections, 'json_engine': _json_engine(), 'kernel_backend': KERNEL_BACKEND}
+    for label, typed_arrays in (('typed_arrays', True), ('plain_json', False)):
+        elapsed = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for fig in figures:
+                figure_to_json(fig, typed_arrays)
+            elapsed.append(time.perf_counter() - start)
+        html = analyzer.create_dashboard(result, executor=None, typed_arrays=typed_arrays)
+        report[label] = {'serialize_seconds': min(elapsed), 'html_bytes': len(html.encode('utf-8'))}
+    
+    report['render_seconds'] = {}
+    for executor in (None, 'thread', 'process'):
+        start = time.perf_counter()
+        analyzer.render_sections(executor, result=result)
+        report['render_seconds'][executor or 'serial'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    html = analyzer.create_dashboard(raw_data, executor=None)
+    report['dashboard_seconds'] = time.perf_counter() - start
+    report['eager_html_bytes'] = len(html[:html.index('<!-- Deferred section payloads')].encode('utf-8'))
+    start = time.perf_counter()
+    svg_html = analyzer.create_dashboard(result, executor=None, backend='svg')
+    report['svg'] = {'dashboard_seconds': time.perf_counter() - start, 'html_bytes': len(svg_html.encode('utf-8'))}
+    report['time_to_interactive'] = measure_time_to_interactive(html)
+    try:
+        start = time.perf_counter()
+        analyzer.to_arrow(result=result)
+        report['arrow_export_seconds'] = time.perf_counter() - start
+    except ImportError:
+        report['arrow_export_seconds'] = None
+    
+    print(f"\n⏱️ Benchmark ({report['detections']} detections, {report['json_engine']} engine, "
+          f"{report['kernel_backend']} kernels):")
+    for label in ('typed_arrays', 'plain_json'):
+        print(f"   • {label}: {report[label]['serialize_seconds'] * 1000:.1f} ms serialize, "
+              f"{report[label]['html_bytes'] / 1024:.0f} KiB HTML")
+    print(f"   • dashboard generation: {report['dashboard_seconds'] * 1000:.1f} ms")
+    serial = report['render_seconds']['serial']
+    print(f"   • section rendering: serial {serial * 1000:.1f} ms, " + ", ".join(
+        f"{name} pool {seconds * 1000:.1f} ms ({serial / seconds:.1f}x)"
+        for name, seconds in report['render_seconds'].items() if name != 'serial'))
+    print(f"   • eagerly parsed HTML: {report['eager_html_bytes'] / 1024:.0f} KiB (chart and table payloads deferred)")
+    print(f"   • SVG backend: {report['svg']['dashboard_seconds'] * 1000:.1f} ms, "
+          f"{report['svg']['html_bytes'] / 1024:.0f} KiB HTML, no plotly.js")
+    timing = report['time_to_interactive']
+    if timing:
+        print(f"   • browser: cards painted {timing.get('cardsPainted', 0):.0f} ms, "
+              f"interactive {timing['interactive']:.0f} ms")
+    else:
+        print("   • browser time-to-interactive: unavailable (needs playwright and Chromium)")
+    if report['arrow_export_seconds'] is not None:
+        print(f"   • Arrow export: {report['arrow_export_seconds'] * 1000:.1f} ms")
+    return report
+
+
 # Example usage and main execution
 if __name__ == "__main__":
     # Your movement detection data - UPDATE THIS WITH NEW DATA
     # Each timestamp represents when a fetal movement was DETECTED/RECORDED
     MOVEMENT_DATA = "4pm, 5pm,5:56pm,8:57pm,9:00pm,9:15pm,9:22pm,9:43pm,10:04pm,10:42pm,23:05,11:34pm,12:41am,12:56am,1:35am,6:37am,7:20am,7:55am,8:05am,1:13pm,2:06pm,2:28pm,3:54pm,4:11pm,4:50pm,5:17pm,5:41pm,5:55pm,7:48pm"
     
+    # python fetal_movement_dashboard.py --benchmark
+    if '--benchmark' in sys.argv:
+        benchmark_dashboard()
+        sys.exit(0)
+    
     # Define the target folder
     TARGET_FOLDER = r"C:\Users\USER\Documents\Movements"
     
@@ -1149,7 +4210,8 @@ if __name__ == "__main__":
     # Create analyzer and generate dashboard
     print("🔄 Analyzing fetal movement detection data...")
     analyzer = FetalMovementAnalyzer()
-    html_dashboard = analyzer.create_dashboard(MOVEMENT_DATA)
+    result = analyzer.analyze(MOVEMENT_DATA)
+    html_dashboard = analyzer.create_dashboard(result)
     
     # Generate filename with timestamp
     timestamp = dt.now().strftime("%Y%m%d_%H%M%S")
@@ -1190,7 +4252,7 @@ if __name__ == "__main__":
         print("💾 Saved to current directory as fallback")
     
     print("\n📊 Comprehensive Analysis Summary:")
-    stats = analyzer.stats
+    stats = result.stats
     print(f"   • Total movement detections: {stats['total_detections']}")
     print(f"   • Average interval: {stats['avg_interval']} minutes")
     print(f"   • Maximum gap: {stats['max_interval']} minutes")
@@ -1200,7 +4262,9 @@ if __name__ == "__main__":
     print(f"   • Concerning intervals: {stats['concern_intervals']}")
     print(f"   • Compliance status: {stats['compliance']}")
     print(f"   • Active hours: {stats['active_hours']}")
-    print(f"   • Peak activity: {'Morning' if stats['morning_movements'] == max(stats['morning_movements'], stats['afternoon_movements'], stats['evening_movements'], stats['night_movements']) else 'Afternoon' if stats['afternoon_movements'] == max(stats['morning_movements'], stats['afternoon_movements'], stats['evening_movements'], stats['night_movements']) else 'Evening' if stats['evening_movements'] == max(stats['morning_movements'], stats['afternoon_movements'], stats['evening_movements'], stats['night_movements']) else 'Night'}")
+    print(f"   • Movement episodes: {stats['episode_count']} (avg {stats['avg_episode_size']} detections each)")
+    print(f"   • Peak activity: {stats['peak_activity_time']} ({stats['peak_activity_period']}, smoothed)")
+    print(f"   • Activity change points: {len(stats['change_points'])}{' (sustained drop)' if stats['activity_drop'] else ''}")
     print(f"   • Generated at: {dt.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Show file location for easy access
@@ -1213,27 +4277,38 @@ if __name__ == "__main__":
     print(f"   2. Run: python fetal_dashboard.py")
     print(f"   3. Dashboard will be automatically updated with new analysis!")
     
-def quick_update(new_movement_data):
+def quick_update(new_movement_data, live=False):
     """
     Quick function to update dashboard with new movement detection data
     Usage: quick_update("8:30am, 9:15am, 10:45am, 12:30pm")
-    """
-    global MOVEMENT_DATA
-    MOVEMENT_DATA = new_movement_data
     
+    With live=True the page is written once and later calls only append
+    the NEW detection times to its data sidecar (see DashboardSidecar).
+    """
     # Run the main execution
     TARGET_FOLDER = r"C:\Users\USER\Documents\Movements"
     os.makedirs(TARGET_FOLDER, exist_ok=True)
     
-    analyzer = FetalMovementAnalyzer()
-    html_dashboard = analyzer.create_dashboard(MOVEMENT_DATA)
-    
     main_filepath = os.path.join(TARGET_FOLDER, "fetal_movement_dashboard.html")
     
+    if live:
+        sidecar = DashboardSidecar(main_filepath)
+        if sidecar.exists():
+            result = sidecar.add_detections(new_movement_data)
+            print(f"📡 Appended {len([t for t in new_movement_data.split(',') if t.strip()])} detections to {sidecar.path}")
+        else:
+            result = sidecar.write_dashboard(new_movement_data)
+            print(f"✅ Live dashboard created: {main_filepath} (data: {sidecar.path})")
+        return result.to_dict()
+    
+    analyzer = FetalMovementAnalyzer()
+    result = analyzer.analyze(new_movement_data)
+    html_dashboard = analyzer.create_dashboard(result)
+    
     with open(main_filepath, 'w', encoding='utf-8') as f:
         f.write(html_dashboard)
     
     print(f"✅ Dashboard updated with new movement detection data!")
     print(f"📁 File: {main_filepath}")
     
-    return analyzer.stats
+    return result.to_dict()